@@ -0,0 +1,243 @@
+"""Версии лент и кэш производных от них значений.
+
+Лента — это строка-идентификатор набора публикаций ('index',
+'category:<slug>', 'profile:<username>', 'post:<id>'). У каждой ленты
+в кэше хранится номер версии; он входит в ключи всех кэшированных значений
+ленты, поэтому сдвиг версии при изменении данных разом делает их
+недоступными.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import partial, wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import urlencode
+from django.views.decorators.http import condition
+
+INDEX_FEED = 'index'
+
+
+def category_feed(slug):
+    return f'category:{slug}'
+
+
+def profile_feed(username):
+    return f'profile:{username}'
+
+
+def post_feed(post_id):
+    return f'post:{post_id}'
+
+
+def post_feeds(post):
+    """Ленты, в которых может появиться публикация, и её страница."""
+    feeds = {
+        INDEX_FEED, profile_feed(post.author.username), post_feed(post.pk)
+    }
+    if post.category is not None:
+        feeds.add(category_feed(post.category.slug))
+    return feeds
+
+
+def posts_feeds(posts):
+    """Ленты и страницы всех публикаций выборки posts."""
+    feeds = set()
+    for post_id, username, slug in posts.values_list(
+        'id', 'author__username', 'category__slug'
+    ):
+        feeds |= {INDEX_FEED, profile_feed(username), post_feed(post_id)}
+        if slug is not None:
+            feeds.add(category_feed(slug))
+    return feeds
+
+
+def _version_key(feed):
+    return f'feed-version:{feed}'
+
+
+def feed_version(feed):
+    # Начальное значение берётся от времени, чтобы вытесненный из кэша
+    # номер не начинался заново и не совпал со старыми ключами.
+    key = _version_key(feed)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        cache.add(key, version, timeout=None)
+        version = cache.get(key, version)
+    return version
+
+
+def _modified_key(feed):
+    return f'feed-modified:{feed}'
+
+
+def feed_modified(feed):
+    # Потерянное кэшем время изменения заменяется текущим: это лишь
+    # отменяет ответы 304 по If-Modified-Since, но не подделывает их.
+    key = _modified_key(feed)
+    modified = cache.get(key)
+    if modified is None:
+        cache.add(key, time.time(), timeout=None)
+        modified = cache.get(key, time.time())
+    return modified
+
+
+def _bump_feeds(feeds):
+    now = time.time()
+    for feed in feeds:
+        try:
+            cache.incr(_version_key(feed))
+        except ValueError:
+            cache.set(_version_key(feed), time.time_ns(), timeout=None)
+        cache.set(_modified_key(feed), now, timeout=None)
+
+
+def touch_feeds(feeds):
+    """Сдвигает версии лент сразу и ещё раз после коммита.
+
+    Параллельный запрос до коммита ещё видит старые данные и может
+    сохранить их в кэш (страницу, карточку, ETag) под новой версией;
+    второй сдвиг делает такие значения недоступными.
+    """
+    feeds = set(feeds)
+    _bump_feeds(feeds)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(partial(_bump_feeds, feeds))
+
+
+def get_feed_count(feed, variant, compute):
+    key = f'feed-count:{feed}:{variant}:{feed_version(feed)}'
+    count = cache.get(key)
+    if count is None:
+        count = compute()
+        cache.set(key, count, timeout=settings.BLOG_FEED_CACHE_TIMEOUT)
+    return count
+
+
+PAGE_CACHE_PARAMS = ('page', 'after', 'before')
+
+
+def _page_key(request, feeds):
+    params = urlencode(sorted(
+        (name, request.GET[name])
+        for name in PAGE_CACHE_PARAMS if name in request.GET
+    ))
+    versions = ':'.join(str(feed_version(feed)) for feed in feeds)
+    raw = f'{request.path}?{params}:{versions}'
+    return 'page:' + hashlib.md5(raw.encode()).hexdigest()
+
+
+def _is_anonymous(request):
+    # Без сессионной cookie пользователь заведомо анонимный, и сессию
+    # не нужно загружать из базы.
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        return True
+    return not request.user.is_authenticated
+
+
+def _cache_page(key, content, response):
+    cache.set(
+        key,
+        (content, response['Content-Type']),
+        timeout=settings.BLOG_FEED_CACHE_TIMEOUT
+    )
+
+
+def _cache_when_streamed(key, content, response):
+    # Потоковая страница кэшируется, только если клиент дочитал её.
+    chunks = []
+    for chunk in content:
+        chunks.append(chunk)
+        yield chunk
+    _cache_page(key, b''.join(chunks), response)
+
+
+def cache_anonymous_page(feeds_for):
+    """Кэширует страницу для анонимных посетителей.
+
+    feeds_for получает именованные аргументы view и возвращает ленты,
+    от которых зависит страница: ключ кэша включает их версии, поэтому
+    сигналы об изменении данных делают старую копию недоступной.
+    Попадание в кэш не обращается ни к ORM, ни к шаблонам.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or not _is_anonymous(
+                    request):
+                return view(request, *args, **kwargs)
+            key = _page_key(request, feeds_for(**kwargs))
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            if response.streaming:
+                response.streaming_content = _cache_when_streamed(
+                    key, response.streaming_content, response
+                )
+            else:
+                _cache_page(key, response.content, response)
+            return response
+        return wrapper
+    return decorator
+
+
+def _viewer(request):
+    """Чем страница зависит от посетителя.
+
+    Для вошедшего пользователя это его id и имя в шапке, а также
+    CSRF-cookie: с ней меняются токены форм комментариев.
+    """
+    if _is_anonymous(request):
+        return 'anonymous'
+    return ':'.join((
+        str(request.user.pk),
+        request.user.get_username(),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+    ))
+
+
+def conditional_page(feeds_for):
+    """Отвечает 304 Not Modified, пока ленты страницы не менялись.
+
+    ETag складывается из версий лент feeds_for(**kwargs) и посетителя,
+    Last-Modified — время последнего изменения этих лент. Оба читаются
+    из кэша до вызова view, поэтому совпавший запрос не доходит ни до
+    ORM, ни до шаблонов. ETag слабый: токены форм в каждом ответе свои.
+    Last-Modified отдаётся только гостям: по одному If-Modified-Since
+    нельзя отличить страницу, показанную другому посетителю.
+    """
+    def etag(request, *args, **kwargs):
+        versions = ':'.join(
+            str(feed_version(feed)) for feed in sorted(feeds_for(**kwargs))
+        )
+        raw = f'{versions}:{_viewer(request)}'
+        return f'W/"{hashlib.md5(raw.encode()).hexdigest()}"'
+
+    def last_modified(request, *args, **kwargs):
+        if not _is_anonymous(request):
+            return None
+        return datetime.fromtimestamp(
+            max(feed_modified(feed) for feed in feeds_for(**kwargs)),
+            tz=timezone.utc
+        )
+
+    def decorator(view):
+        conditional_view = condition(etag, last_modified)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            # Страница зависит от того, кто вошёл, — то есть от cookie.
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """Кэш сайта должен быть общим для всех его процессов.
+
+    Через него сбрасываются закэшированные страницы, счётчики, карточки
+    и ETag; в кэше отдельного процесса другие процессы этого не видят.
+    """
+    if settings.DEBUG:
+        return []
+    if settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        'Кэш по умолчанию хранится в памяти процесса.',
+        hint=(
+            'Если сайт обслуживают несколько процессов, задайте общий кэш'
+            ' (BLOG_CACHE_BACKEND и BLOG_CACHE_LOCATION), иначе они будут'
+            ' отдавать устаревшие страницы и счётчики.'
+        ),
+        id='blog.W001',
+    )]
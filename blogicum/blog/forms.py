@@ -2,6 +2,7 @@ from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
 
+from .lookups import LookupChoiceField
 from .models import Category, Comment, Post
 
 User = get_user_model()
@@ -22,7 +23,7 @@ class UserEditForm(forms.ModelForm):
 
 
 class CreatePostForm(forms.ModelForm):
-    category = forms.ModelChoiceField(
+    category = LookupChoiceField(
         queryset=Category.objects,
         empty_label=None
     )
@@ -30,6 +31,7 @@ class CreatePostForm(forms.ModelForm):
     class Meta:
         model = Post
         exclude = ('author', 'comment_count')
+        field_classes = {'location': LookupChoiceField}
         widgets = {
             'pub_date': forms.DateInput(attrs={'type': 'date'})
         }
@@ -0,0 +1,166 @@
+"""Копии изображений постов вне запроса.
+
+Пост с новым изображением сохраняется только с размерами оригинала в
+image_meta, а копии делаются после коммита в пуле процессов
+(BLOG_IMAGE_WORKERS) или командой process_images. Пока копий нет,
+шаблоны показывают оригинал.
+
+Один файл изображения может принадлежать нескольким постам
+(blog.storage). Файл и его копии удаляются, когда на них не остаётся
+ссылок.
+"""
+import logging
+import posixpath
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+
+from .images import make_variants, variant_paths
+from .models import Post
+from .storage import post_images_storage
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def pending_posts():
+    """Посты с изображением, для которого ещё нет копий."""
+    return Post.objects.exclude(image='').exclude(
+        image_meta__has_key='variants'
+    )
+
+
+def image_references(name):
+    """Число постов, ссылающихся на файл изображения name."""
+    return Post.objects.filter(image=name).count()
+
+
+def release_images(names):
+    """Удаляет файлы names и их копии, если на них нет ссылок.
+
+    Возвращает число удалённых файлов. Файлы, использованные в
+    последние BLOG_IMAGE_RELEASE_GRACE секунд, остаются: на них может
+    ссылаться ещё не закоммиченный пост. Их, как и файлы из откаченных
+    транзакций, удаляет команда sweep_images.
+    Копии называются по имени файла без расширения, поэтому они общие
+    у файлов с одинаковым именем и разными расширениями.
+    """
+    released = 0
+    for name in names:
+        if image_references(name) or not post_images_storage.delete_unused(
+                name, settings.BLOG_IMAGE_RELEASE_GRACE):
+            continue
+        released += 1
+        stem = posixpath.splitext(name)[0]
+        if not Post.objects.filter(image__startswith=f'{stem}.').exists():
+            for path in variant_paths(name):
+                default_storage.delete(path)
+    return released
+
+
+def release_after_commit(names):
+    if names:
+        transaction.on_commit(partial(release_images, names))
+
+
+def store_variants(post_id, name, image_meta):
+    """Записывает готовые копии, если у поста всё ещё изображение name.
+
+    Сохранение через save() запускает сигналы: сбрасываются кэш
+    карточки, страницы лент и запись ленты.
+    """
+    with transaction.atomic():
+        post = Post.objects.select_for_update().filter(
+            pk=post_id, image=name
+        ).first()
+        if post is None:
+            return False
+        post.image_meta = image_meta
+        post.save(update_fields=('image_meta',))
+    return True
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.BLOG_IMAGE_WORKERS
+        )
+    return _executor
+
+
+def _store_result(post_id, name, future):
+    # Вызывается в служебном потоке пула: его соединения с базой
+    # нужно закрыть самим.
+    error = future.exception()
+    if error is not None:
+        logger.error(
+            'Не удалось сделать копии изображения %s', name,
+            exc_info=error
+        )
+        return
+    try:
+        store_variants(post_id, name, future.result())
+    finally:
+        connections.close_all()
+
+
+def _submit(post_id, name):
+    """Отдаёт изображение пулу; сломанный пул создаётся заново.
+
+    Пул ломается, если его процесс убит (например, при нехватке
+    памяти). Если не помогает и новый, пост остаётся в pending_posts():
+    данные уже закоммичены, и ошибка здесь не должна доходить до
+    запроса.
+    """
+    global _executor
+    for attempt in range(2):
+        try:
+            future = _get_executor().submit(make_variants, name)
+        except BrokenProcessPool:
+            _executor = None
+            continue
+        future.add_done_callback(partial(_store_result, post_id, name))
+        return
+    logger.error(
+        'Пул обработки изображений недоступен, копии %s сделает'
+        ' process_images', name
+    )
+
+
+def schedule_variants(post):
+    """Ставит изображение поста в очередь пула после коммита.
+
+    При BLOG_IMAGE_WORKERS = 0 изображение остаётся в pending_posts()
+    до запуска process_images.
+    """
+    if settings.BLOG_IMAGE_WORKERS:
+        transaction.on_commit(partial(_submit, post.pk, post.image.name))
+
+
+def process_images(posts, jobs=None):
+    """Делает копии изображений постов posts на jobs процессах.
+
+    Возвращает число постов, для которых копии записаны, и имена
+    файлов, которые не удалось обработать.
+    """
+    items = posts.exclude(image='').values_list('pk', 'image')
+    processed, failed = 0, []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(make_variants, name): (post_id, name)
+            for post_id, name in items
+        }
+        for future in as_completed(futures):
+            post_id, name = futures[future]
+            if future.exception() is not None:
+                failed.append(name)
+                continue
+            processed += store_variants(post_id, name, future.result())
+    return processed, failed
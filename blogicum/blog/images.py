@@ -0,0 +1,150 @@
+"""Уменьшенные копии изображений постов.
+
+Для каждой ширины из IMAGE_VARIANTS (но не шире оригинала) сохраняются
+копия в исходном формате (JPEG или PNG с прозрачностью) и копия WebP.
+Размеры оригинала и описание копий хранятся в Post.image_meta:
+{'width': ..., 'height': ..., 'variants': {'card': {'width': ...,
+'height': ..., 'path': ..., 'webp': ...}, ...}}.
+"""
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.core.files.images import get_image_dimensions
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+IMAGE_VARIANTS = (
+    ('card', 640),
+    ('detail', 960),
+    ('retina', 1280),
+)
+VARIANTS_DIR = 'posts_images/variants'
+VARIANT_EXTENSIONS = ('jpg', 'png', 'webp')
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+# Карточка поста шириной 40rem, на узком экране — во всю ширину.
+IMAGE_SIZES = '(max-width: 40rem) 100vw, 40rem'
+
+
+def _encode(image, image_format, **options):
+    buffer = BytesIO()
+    image.save(buffer, image_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def _variant_path(name, variant, extension):
+    stem = PurePosixPath(name).stem
+    return f'{VARIANTS_DIR}/{stem}_{variant}.{extension}'
+
+
+def _replace(storage, path, content):
+    # Имена копий выводятся из имени оригинала: повторная обработка
+    # перезаписывает их, а не плодит новые файлы.
+    storage.delete(path)
+    return storage.save(path, content)
+
+
+def variant_paths(name):
+    """Все возможные имена копий изображения name."""
+    for variant, _ in IMAGE_VARIANTS:
+        for extension in VARIANT_EXTENSIONS:
+            yield _variant_path(name, variant, extension)
+
+
+def read_dimensions(image_file):
+    """image_meta изображения, для которого ещё нет копий.
+
+    Читается только заголовок файла, без декодирования.
+    """
+    width, height = get_image_dimensions(image_file)
+    return {'width': width, 'height': height}
+
+
+def make_variants(name, storage=default_storage):
+    """Сохраняет копии изображения name и возвращает image_meta.
+
+    Работает только с хранилищем, без базы данных, поэтому может
+    выполняться в отдельном процессе.
+    """
+    with storage.open(name, 'rb') as image_file, Image.open(
+            image_file) as original:
+        original = ImageOps.exif_transpose(original)
+        has_alpha = 'A' in original.getbands()
+        original = original.convert('RGBA' if has_alpha else 'RGB')
+    variants = {}
+    previous_width = 0
+    for variant, width in IMAGE_VARIANTS:
+        # Копии не бывают шире оригинала: последняя берёт его ширину.
+        width = min(width, original.width)
+        if width <= previous_width:
+            break
+        previous_width = width
+        resized = original
+        if width < original.width:
+            height = round(original.height * width / original.width)
+            resized = original.resize((width, height), Image.LANCZOS)
+        if has_alpha:
+            content = _encode(resized, 'PNG', optimize=True)
+            extension = 'png'
+        else:
+            content = _encode(
+                resized, 'JPEG', quality=JPEG_QUALITY, optimize=True,
+                progressive=True
+            )
+            extension = 'jpg'
+        webp = _encode(resized, 'WEBP', quality=WEBP_QUALITY, method=4)
+        variants[variant] = {
+            'width': resized.width,
+            'height': resized.height,
+            'path': _replace(
+                storage, _variant_path(name, variant, extension), content
+            ),
+            'webp': _replace(
+                storage, _variant_path(name, variant, 'webp'), webp
+            ),
+        }
+    return {
+        'width': original.width,
+        'height': original.height,
+        'variants': variants,
+    }
+
+
+class ResponsiveImageMixin:
+    """Адреса копий изображения для <picture> и srcset."""
+
+    image_sizes = IMAGE_SIZES
+
+    @property
+    def image_width(self):
+        return self.image_meta.get('width')
+
+    @property
+    def image_height(self):
+        return self.image_meta.get('height')
+
+    @property
+    def image_variants(self):
+        return self.image_meta.get('variants', {})
+
+    def _image_srcset(self, key):
+        return ', '.join(
+            f"{default_storage.url(variant[key])} {variant['width']}w"
+            for variant in self.image_variants.values()
+        )
+
+    @property
+    def image_srcset(self):
+        return self._image_srcset('path')
+
+    @property
+    def image_webp_srcset(self):
+        return self._image_srcset('webp')
+
+    @property
+    def image_src(self):
+        card = self.image_variants.get('card')
+        if card is None:
+            return self.image.url
+        return default_storage.url(card['path'])
@@ -0,0 +1,134 @@
+"""Категории и места в памяти процесса.
+
+Таблицы маленькие и меняются редко, поэтому каждый процесс держит их
+целиком. Сигналы сдвигают общую версию справочника в кэше (как версии
+лент в blog.caching), и все процессы перечитывают таблицы при
+следующем обращении. Если кэш не общий для процессов (LocMemCache),
+чужие изменения станут видны не позже чем через BLOG_LOOKUPS_MAX_AGE
+секунд. Объекты справочника общие для всех запросов процесса: их
+нельзя изменять.
+"""
+import time
+
+from django import forms
+from django.conf import settings
+from django.db.models.query import ModelIterable
+from django.forms.models import ModelChoiceIterator
+
+from .caching import feed_version, touch_feeds
+from .models import Category, Location, Post
+
+LOOKUPS_VERSION = 'lookups'
+
+_lookups = None
+
+
+class Lookups:
+
+    def __init__(self, version):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.categories = {
+            category.pk: category
+            for category in Category.objects.order_by('pk')
+        }
+        self.category_slugs = {
+            category.slug: category for category in self.categories.values()
+        }
+        self.locations = {
+            location.pk: location
+            for location in Location.objects.order_by('pk')
+        }
+
+    def objects(self, model):
+        return {Category: self.categories, Location: self.locations}[model]
+
+    def published_category(self, slug):
+        category = self.category_slugs.get(slug)
+        if category is None or not category.is_published:
+            return None
+        return category
+
+    def attach(self, post):
+        """Подставляет посту категорию и место без запросов к базе."""
+        for field, objects in (
+            (Post.category.field, self.categories),
+            (Post.location.field, self.locations),
+        ):
+            related = objects.get(getattr(post, field.attname))
+            if related is not None:
+                field.set_cached_value(post, related)
+        return post
+
+
+def current():
+    global _lookups
+    version = feed_version(LOOKUPS_VERSION)
+    if (
+        _lookups is None
+        or _lookups.version != version
+        or time.monotonic() - _lookups.loaded_at
+        > settings.BLOG_LOOKUPS_MAX_AGE
+    ):
+        _lookups = Lookups(version)
+    return _lookups
+
+
+def published_category(slug):
+    return current().published_category(slug)
+
+
+def invalidate():
+    touch_feeds([LOOKUPS_VERSION])
+
+
+class LookupsIterable(ModelIterable):
+
+    def __iter__(self):
+        lookups = current()
+        for post in super().__iter__():
+            yield lookups.attach(post)
+
+
+def with_lookups(posts):
+    """Выборка постов, которые берут категорию и место из справочника.
+
+    Заменяет select_related('category', 'location') и работает и при
+    чтении через iterator().
+    """
+    posts = posts.all()
+    posts._iterable_class = LookupsIterable
+    return posts
+
+
+class LookupChoiceIterator(ModelChoiceIterator):
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for obj in self.field.lookup_objects().values():
+            yield self.choice(obj)
+
+    def __len__(self):
+        return len(self.field.lookup_objects()) + (
+            self.field.empty_label is not None
+        )
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(
+            self.field.lookup_objects()
+        )
+
+
+class LookupChoiceField(forms.ModelChoiceField):
+    """ModelChoiceField, который рендерит варианты из справочника.
+
+    Выбранное значение по-прежнему читается из базы: по нему пост
+    вычисляет видимость и копирует категорию в ленту, а справочник
+    процесса может отставать.
+    """
+
+    iterator = LookupChoiceIterator
+
+    def lookup_objects(self):
+        return current().objects(self.queryset.model)
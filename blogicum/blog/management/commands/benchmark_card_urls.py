@@ -0,0 +1,54 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from blog import routes
+from blog.views import POSTS_PER_PAGE
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает построение адресов карточек одной страницы ленты'
+        ' через reverse() и через blog.routes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    @staticmethod
+    def reverse_page():
+        # Столько же обращений, сколько делала карточка с {% url %}.
+        for post_id in range(POSTS_PER_PAGE):
+            reverse('blog:profile', args=['author'])
+            reverse('blog:post_detail', args=[post_id])
+            reverse('blog:post_detail', args=[post_id])
+            reverse('blog:category_posts', args=['category'])
+
+    @staticmethod
+    def routes_page():
+        # Одна таблица на страницу, как в routes.attach().
+        table = routes.current()
+        for post_id in range(POSTS_PER_PAGE):
+            table.profile_url('author')
+            table.post_detail_url(post_id)
+            table.post_detail_url(post_id)
+            table.category_url('category')
+
+    def measure(self, label, page, pages, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(pages):
+                page()
+            timings.append((time.perf_counter() - start) / pages)
+        self.stdout.write(
+            f'{label:<12} {statistics.median(timings) * 1e6:9.1f} мкс'
+            ' на страницу'
+        )
+
+    def handle(self, *args, pages, repeat, **options):
+        self.measure('reverse()', self.reverse_page, pages, repeat)
+        self.measure('blog.routes', self.routes_page, pages, repeat)
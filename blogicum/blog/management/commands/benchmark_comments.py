@@ -0,0 +1,101 @@
+import inspect
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from blog import views
+from blog.models import Category, Comment, Post
+from blog.paginators import encode_cursor
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет страницу поста с большим числом комментариев.'
+        ' Данные создаются во временной транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--baseline',
+            action='store_true',
+            help='Также отрендерить все комментарии разом, как раньше.'
+        )
+
+    def measure(self, label, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        self.stdout.write(
+            f'{label:<36} {statistics.median(timings) * 1000:9.1f} мс'
+        )
+
+    def handle(self, *args, comments, repeat, baseline, **options):
+        try:
+            with transaction.atomic():
+                self.run(comments, repeat, baseline)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, comments, repeat, baseline):
+        author = User.objects.create(username='benchmark_comments_author')
+        category = Category.objects.create(
+            title='Бенчмарк', description='', slug='benchmark-comments'
+        )
+        post = Post.objects.create(
+            title='Бенчмарк', text='Текст', author=author, category=category
+        )
+        Comment.objects.bulk_create(
+            (Comment(text=f'Комментарий {i}', author=author, post=post)
+             for i in range(comments)),
+            batch_size=5000
+        )
+        self.stdout.write(f'Комментариев у поста: {comments}')
+
+        factory = RequestFactory()
+        # Замеряем сами view, без условных ответов и кэша страниц.
+        post_detail = inspect.unwrap(views.post_detail)
+        post_comments = inspect.unwrap(views.post_comments)
+
+        def get(view, params=None):
+            request = factory.get('/', params or {})
+            request.user = AnonymousUser()
+            return view(request, post_id=post.id)
+
+        deep = Comment.objects.filter(post=post).order_by(
+            '-created_at', '-pk'
+        ).values_list('created_at', 'pk')[views.COMMENTS_PER_PAGE]
+        deep_cursor = encode_cursor(*deep)
+
+        self.measure('post_detail (первая страница)',
+                     lambda: get(post_detail), repeat)
+        self.measure('post_comments (первая порция)',
+                     lambda: get(post_comments), repeat)
+        self.measure('post_comments (последняя порция)',
+                     lambda: get(post_comments, {'after': deep_cursor}),
+                     repeat)
+        if baseline:
+            self.measure(
+                'все комментарии одной страницей',
+                lambda: render_to_string('includes/comment_list.html', {
+                    'post': post,
+                    'comments': post.comment.select_related('author'),
+                }),
+                1
+            )
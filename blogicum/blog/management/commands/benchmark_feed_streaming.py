@@ -0,0 +1,107 @@
+import inspect
+import statistics
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory, override_settings
+
+from blog import views
+from blog.models import Category, Post
+
+User = get_user_model()
+
+# Без кэша: каждая карточка действительно рендерится.
+NO_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время до первого байта, полное время и пик памяти'
+        ' страницы ленты при обычном и потоковом рендеринге.'
+        ' Данные создаются во временной транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=200)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, posts, repeat, **options):
+        # Шаблоны кэшируются, как в продакшене: иначе потоковый режим
+        # заново разбирал бы post_card.html для каждой карточки.
+        templates = [{
+            **settings.TEMPLATES[0],
+            'OPTIONS': {
+                **settings.TEMPLATES[0]['OPTIONS'],
+                'loaders': [(
+                    'django.template.loaders.cached.Loader',
+                    settings.TEMPLATE_LOADERS
+                )],
+            },
+        }]
+        try:
+            with transaction.atomic(), override_settings(
+                CACHES=NO_CACHE, TEMPLATES=templates
+            ):
+                self.run(posts, repeat)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def fetch(self, streaming):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        start = time.perf_counter()
+        with override_settings(BLOG_STREAM_FEEDS=streaming):
+            response = inspect.unwrap(views.index)(request)
+            if streaming:
+                chunks = iter(response.streaming_content)
+                first = next(chunks)
+                ttfb = time.perf_counter() - start
+                size = len(first) + sum(len(chunk) for chunk in chunks)
+            else:
+                ttfb = time.perf_counter() - start
+                size = len(response.content)
+        return ttfb, time.perf_counter() - start, size
+
+    def measure(self, label, streaming, repeat):
+        ttfbs, totals, peaks = [], [], []
+        for _ in range(repeat):
+            tracemalloc.start()
+            ttfb, total, size = self.fetch(streaming)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            ttfbs.append(ttfb)
+            totals.append(total)
+        self.stdout.write(
+            f'{label:<10} TTFB {statistics.median(ttfbs) * 1000:7.1f} мс,'
+            f' всего {statistics.median(totals) * 1000:7.1f} мс,'
+            f' пик памяти {statistics.median(peaks) / 1024:8.1f} КБ,'
+            f' страница {size / 1024:.1f} КБ'
+        )
+
+    def run(self, posts, repeat):
+        author = User.objects.create(username='benchmark_feed_author')
+        category = Category.objects.create(
+            title='Бенчмарк', description='', slug='benchmark-feed'
+        )
+        for i in range(posts):
+            Post.objects.create(
+                title=f'Пост {i}', text='Текст ' * 50,
+                author=author, category=category
+            )
+        self.stdout.write(f'Постов в ленте: {posts}')
+        # Первый проход прогревает шаблоны и резолвер.
+        self.fetch(False)
+        self.measure('render()', False, repeat)
+        self.measure('поток', True, repeat)
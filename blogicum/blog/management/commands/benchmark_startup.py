@@ -0,0 +1,80 @@
+import json
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Выполняется в отдельном процессе, чтобы каждый замер начинался
+# с холодного интерпретатора, как новый воркер после деплоя.
+SCRIPT = '''
+import json
+import sys
+import time
+
+start = time.perf_counter()
+import django
+from django.conf import settings
+
+django.setup()
+# Настройки как в продакшене: DEBUG выключен, шаблоны кэшируются.
+settings.DEBUG = False
+options = settings.TEMPLATES[0]['OPTIONS']
+options['loaders'] = [
+    ('django.template.loaders.cached.Loader', settings.TEMPLATE_LOADERS)
+]
+from django.core.wsgi import get_wsgi_application
+
+get_wsgi_application()
+timings = {'startup': time.perf_counter() - start}
+if sys.argv[1] == 'warm':
+    from blogicum.warmup import warm_up
+
+    start = time.perf_counter()
+    warm_up()
+    timings['warm_up'] = time.perf_counter() - start
+from django.test import Client
+
+client = Client(SERVER_NAME='localhost')
+for url in sys.argv[2:]:
+    start = time.perf_counter()
+    client.get(url)
+    timings[url] = time.perf_counter() - start
+print(json.dumps(timings))
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет запуск воркера и первые запросы к нему'
+        ' без прогрева шаблонов и маршрутов и с ним.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--url',
+            action='append',
+            dest='urls',
+            help='Адрес первого запроса; можно указать несколько раз.'
+        )
+
+    def run_worker(self, mode, urls):
+        output = subprocess.run(
+            [sys.executable, '-c', SCRIPT, mode, *urls],
+            cwd=settings.BASE_DIR,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        return json.loads(output.splitlines()[-1])
+
+    def handle(self, *args, repeat, urls, **options):
+        urls = urls or ['/', '/pages/about/', '/auth/login/']
+        for mode in ('cold', 'warm'):
+            runs = [self.run_worker(mode, urls) for _ in range(repeat)]
+            self.stdout.write(f'{mode}:')
+            for label in runs[0]:
+                median = statistics.median(run[label] for run in runs)
+                self.stdout.write(f'  {label:<30} {median * 1000:9.1f} мс')
@@ -0,0 +1,137 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.template.backends.django import DjangoTemplates
+from django.test import RequestFactory, override_settings
+from django.urls import resolve
+
+from blog import routes, views
+from blog.forms import CommentForm
+from blog.models import Category, Comment, Post, TimelineEntry
+from blog.paginators import KeysetPaginator
+
+User = get_user_model()
+
+NO_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает рендеринг blog/index.html (10 карточек) и'
+        ' blog/detail.html (500 комментариев) шаблонами Django и Jinja2.'
+        ' Данные создаются во временной транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, comments, repeat, **options):
+        try:
+            from django.template.backends.jinja2 import Jinja2
+        except ImportError:
+            raise CommandError('Для сравнения нужен пакет Jinja2.')
+        # Оба движка в продакшен-режиме: шаблоны скомпилированы один раз.
+        engines = {
+            'Django': DjangoTemplates({
+                'NAME': 'benchmark-django',
+                'DIRS': settings.TEMPLATES[-1]['DIRS'],
+                'APP_DIRS': False,
+                'OPTIONS': {
+                    **settings.TEMPLATES[-1]['OPTIONS'],
+                    'loaders': [(
+                        'django.template.loaders.cached.Loader',
+                        settings.TEMPLATE_LOADERS
+                    )],
+                },
+            }),
+            'Jinja2': Jinja2({
+                'NAME': 'benchmark-jinja2',
+                'DIRS': settings.BLOG_JINJA2_TEMPLATES['DIRS'],
+                'APP_DIRS': False,
+                'OPTIONS': {
+                    **settings.BLOG_JINJA2_TEMPLATES['OPTIONS'],
+                    'auto_reload': False,
+                },
+            }),
+        }
+        try:
+            with transaction.atomic(), override_settings(CACHES=NO_CACHE):
+                self.run(engines, comments, repeat)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def measure(self, label, render, repeat):
+        render()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            render()
+            timings.append(time.perf_counter() - start)
+        self.stdout.write(
+            f'{label:<32} {statistics.median(timings) * 1000:8.2f} мс'
+        )
+
+    def run(self, engines, comments, repeat):
+        author = User.objects.create(username='benchmark_templates_author')
+        category = Category.objects.create(
+            title='Бенчмарк', description='', slug='benchmark-templates'
+        )
+        for i in range(views.POSTS_PER_PAGE):
+            Post.objects.create(
+                title=f'Пост {i}', text='Текст ' * 50,
+                author=author, category=category
+            )
+        post = Post.objects.select_related(
+            'author', 'category', 'location'
+        ).filter(author=author).first()
+        Comment.objects.bulk_create(
+            Comment(text=f'Комментарий {i}', author=author, post=post)
+            for i in range(comments)
+        )
+
+        factory = RequestFactory()
+        index_request = factory.get('/')
+        index_request.resolver_match = resolve('/')
+        index_request.user = author
+        page_obj = views.get_page_obj(
+            TimelineEntry.objects.filter(author_id=author.pk),
+            views.POSTS_PER_PAGE, index_request
+        )
+        routes.attach(page_obj)
+        detail_request = factory.get(post.get_absolute_url())
+        detail_request.resolver_match = resolve(post.get_absolute_url())
+        detail_request.user = author
+        detail_context = {
+            'post': post,
+            'form': CommentForm(),
+            'comments': KeysetPaginator(
+                post.comment.select_related('author'), comments,
+                date_field='created_at', descending=False
+            ).get_page(),
+        }
+
+        for name, engine in engines.items():
+            index = engine.get_template('blog/index.html')
+            detail = engine.get_template('blog/detail.html')
+            self.measure(
+                f'{name}: index, {len(page_obj)} карточек',
+                lambda: index.render({'page_obj': page_obj}, index_request),
+                repeat
+            )
+            self.measure(
+                f'{name}: detail, {comments} комментариев',
+                lambda: detail.render(detail_context, detail_request),
+                repeat
+            )
@@ -0,0 +1,71 @@
+import base64
+import hashlib
+import posixpath
+from pathlib import Path
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.contrib.staticfiles.management.commands.collectstatic import (
+    Command as CollectStaticCommand
+)
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django_bootstrap5.core import get_bootstrap_setting
+
+from blogicum.staticfiles import BOOTSTRAP_DIR, CompressedManifestStorage
+
+BOOTSTRAP_SETTINGS = ('css_url', 'javascript_url')
+
+
+def check_integrity(content, integrity):
+    """Сверяет файл с атрибутом integrity (SRI) из настроек Bootstrap."""
+    algorithm, _, expected = integrity.partition('-')
+    digest = base64.b64encode(hashlib.new(algorithm, content).digest())
+    return digest.decode() == expected
+
+
+class Command(BaseCommand):
+    help = (
+        'Кладёт Bootstrap в статику сайта и собирает статику в STATIC_ROOT:'
+        ' с хэшем содержимого в именах файлов, манифестом и сжатыми'
+        ' копиями .gz/.br.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--skip-vendor',
+            action='store_true',
+            help='Не скачивать Bootstrap, собрать то, что уже есть.'
+        )
+
+    def handle(self, *args, skip_vendor, verbosity, **options):
+        if not skip_vendor:
+            for setting in BOOTSTRAP_SETTINGS:
+                self.vendor(get_bootstrap_setting(setting))
+        collectstatic = CollectStaticCommand(
+            stdout=self.stdout, stderr=self.stderr
+        )
+        # Сборка всегда идёт в боевое хранилище, даже при DEBUG.
+        collectstatic.storage = CompressedManifestStorage()
+        call_command(
+            collectstatic, interactive=False, verbosity=verbosity
+        )
+
+    def vendor(self, source):
+        url = source['url']
+        target = (
+            Path(settings.STATICFILES_DIRS[0]) / BOOTSTRAP_DIR
+            / posixpath.basename(url)
+        )
+        integrity = source.get('integrity')
+        if target.exists() and (
+                integrity is None
+                or check_integrity(target.read_bytes(), integrity)):
+            return
+        with urlopen(url) as response:
+            content = response.read()
+        if integrity is not None and not check_integrity(content, integrity):
+            raise CommandError(f'Контрольная сумма {url} не совпадает.')
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+        self.stdout.write(f'Сохранён {target}.')
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.image_processing import pending_posts, process_images
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Делает копии изображений постов, для которых их ещё нет.'
+        ' С --all пересоздаёт копии всех изображений, с --loop работает'
+        ' постоянно. Изображения обрабатываются параллельно.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересоздать копии всех изображений, а не только новых.'
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=None,
+            help='Число процессов; по умолчанию — по числу ядер.'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а ждать новых изображений.'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=5,
+            help='Пауза между проверками в секундах.'
+        )
+
+    def handle(self, *args, all, jobs, loop, sleep, **options):
+        posts = Post.objects.all() if all else pending_posts()
+        skipped = set()
+        while True:
+            processed, failed = process_images(posts, jobs)
+            if processed or not loop:
+                self.stdout.write(f'Обработано изображений: {processed}.')
+            for name in failed:
+                self.stderr.write(f'Не удалось обработать {name}.')
+            if not loop:
+                return
+            # Повреждённые файлы не перечитываются на каждой итерации.
+            skipped.update(failed)
+            posts = pending_posts().exclude(image__in=skipped)
+            time.sleep(sleep)
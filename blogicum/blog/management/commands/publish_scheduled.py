@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.publication import next_publication, publish_due_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Публикует отложенные посты, чья дата публикации наступила.'
+        ' С --loop работает постоянно и просыпается к ближайшей дате.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а ждать следующих публикаций.'
+        )
+        parser.add_argument(
+            '--max-sleep',
+            type=float,
+            default=60,
+            help=(
+                'Наибольшая пауза между проверками в секундах: за это'
+                ' время подхватываются новые отложенные посты.'
+            )
+        )
+
+    def handle(self, *args, loop, max_sleep, **options):
+        while True:
+            published = publish_due_posts()
+            due = next_publication()
+            if published or not loop:
+                self.stdout.write(
+                    f'Опубликовано постов: {published}. Следующая'
+                    f' публикация: {self.format_due(due)}.'
+                )
+            if not loop:
+                return
+            time.sleep(self.sleep_for(due, max_sleep))
+
+    @staticmethod
+    def format_due(due):
+        if due is None:
+            return 'нет'
+        return timezone.localtime(due).isoformat(timespec='seconds')
+
+    @staticmethod
+    def sleep_for(due, max_sleep):
+        if due is None:
+            return max_sleep
+        seconds = (due - timezone.now()).total_seconds()
+        return min(max(seconds, 0), max_sleep)
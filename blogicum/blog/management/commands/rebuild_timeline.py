@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from blog.caching import INDEX_FEED, category_feed, profile_feed, touch_feeds
+from blog.models import Category, TimelineEntry
+from blog.timeline import rebuild_timeline
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает таблицу ленты TimelineEntry по видимым постам'
+
+    def handle(self, *args, **options):
+        count = rebuild_timeline()
+        # Страницы постов от таблицы ленты не зависят.
+        usernames = TimelineEntry.objects.values_list(
+            'author_username', flat=True
+        ).distinct()
+        slugs = Category.objects.values_list('slug', flat=True)
+        touch_feeds(
+            {INDEX_FEED}
+            | {category_feed(slug) for slug in slugs}
+            | {profile_feed(username) for username in usernames}
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Записей в ленте: {count}.'
+        ))
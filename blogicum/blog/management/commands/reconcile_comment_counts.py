@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.caching import posts_feeds, touch_feeds
+from blog.models import Comment, Post
+from blog.timeline import refresh_timeline
+
+
+class Command(BaseCommand):
+    help = 'Сверяет Post.comment_count с фактическим числом комментариев'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Сколько постов проверять за один запрос.'
+        )
+
+    def handle(self, *args, chunk_size, **options):
+        checked = fixed = 0
+        last_id = 0
+        while True:
+            chunk = list(
+                Post.objects.filter(pk__gt=last_id)
+                .order_by('pk')
+                .annotate(actual=Count('comment'))
+                .only('id', 'comment_count')[:chunk_size]
+            )
+            if not chunk:
+                break
+            last_id = chunk[-1].pk
+            checked += len(chunk)
+            drifted = [post for post in chunk
+                       if post.comment_count != post.actual]
+            if not drifted:
+                continue
+            drifted_ids = [post.pk for post in drifted]
+            # Число считается в том же UPDATE: комментарий, добавленный
+            # после чтения, не затирается устаревшим значением.
+            actual = Comment.objects.filter(post=OuterRef('pk')).values(
+                'post'
+            ).annotate(count=Count('pk')).values('count')
+            Post.objects.filter(pk__in=drifted_ids).update(
+                comment_count=Coalesce(Subquery(actual), 0)
+            )
+            refresh_timeline(drifted_ids)
+            touch_feeds(posts_feeds(Post.objects.filter(pk__in=drifted_ids)))
+            fixed += len(drifted)
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено постов: {checked}, исправлено счётчиков: {fixed}.'
+        ))
@@ -0,0 +1,48 @@
+import os
+import posixpath
+import re
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.image_processing import release_images
+from blog.storage import post_images_storage
+
+IMAGES_DIR = 'posts_images'
+# Каталоги <ab> хранилища по содержимому; variants и прочие не трогаются.
+BLOB_DIR = re.compile(r'^[0-9a-f]{2}$')
+TEMPORARY_SUFFIXES = ('.part', '.released')
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет изображения постов без ссылок, не использованные дольше'
+        ' BLOG_IMAGE_RELEASE_GRACE секунд (в том числе загруженные в'
+        ' откаченных транзакциях), и брошенные временные файлы.'
+    )
+
+    def handle(self, *args, **options):
+        deadline = time.time() - settings.BLOG_IMAGE_RELEASE_GRACE
+        directories, files = post_images_storage.listdir(IMAGES_DIR)
+        blobs, temporary = [], [
+            posixpath.join(IMAGES_DIR, filename) for filename in files
+            if filename.endswith(TEMPORARY_SUFFIXES)
+        ]
+        for directory in filter(BLOB_DIR.match, directories):
+            directory = posixpath.join(IMAGES_DIR, directory)
+            for filename in post_images_storage.listdir(directory)[1]:
+                name = posixpath.join(directory, filename)
+                if filename.endswith(TEMPORARY_SUFFIXES):
+                    temporary.append(name)
+                else:
+                    blobs.append(name)
+        removed = 0
+        for name in temporary:
+            if os.stat(post_images_storage.path(name)).st_mtime < deadline:
+                post_images_storage.delete(name)
+                removed += 1
+        released = release_images(blobs)
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено изображений: {released}, временных файлов: {removed}.'
+        ))
@@ -0,0 +1,141 @@
+"""Раздача загруженных файлов (MEDIA_ROOT).
+
+При BLOG_MEDIA_SENDFILE view только проверяет запрос и заголовки
+условного GET, а байты файла отдаёт фронтовой прокси: nginx по
+X-Accel-Redirect или Apache/lighttpd по X-Sendfile. Без прокси файл
+отдаётся через FileResponse (sendfile сервера приложений, если он
+есть) с поддержкой If-None-Match, If-Modified-Since и Range.
+"""
+import mimetypes
+import posixpath
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import (
+    FileResponse, Http404, HttpResponse, StreamingHttpResponse
+)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags
+from django.views.decorators.http import require_safe
+
+# Имена файлов из ContentAddressedStorage: содержимое под ними не меняется.
+IMMUTABLE_NAME = re.compile(r'^posts_images/[0-9a-f]{2}/[0-9a-f]{64}\.\w+$')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def _file_path(path):
+    # Путь за пределами MEDIA_ROOT — SuspiciousFileOperation, ответ 400.
+    name = posixpath.normpath(path).lstrip('/')
+    file_path = Path(safe_join(settings.MEDIA_ROOT, name))
+    if not file_path.is_file():
+        raise Http404
+    return name, file_path
+
+
+def _etag(stat):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def parse_range(header, size):
+    """Границы (start, end) одного диапазона байтов из заголовка Range.
+
+    None — заголовок не разобран и файл отдаётся целиком, ValueError —
+    диапазон за пределами файла.
+    """
+    match = RANGE_HEADER.match(header or '')
+    if match is None or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if not start:
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    if start > end or start >= size:
+        raise ValueError
+    return start, end
+
+
+def _read_range(file, start, length):
+    with file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+def _range_for(request, etag, size):
+    # If-Range с устаревшим ETag означает запрос всего файла.
+    if_range = request.headers.get('If-Range')
+    if if_range is not None and etag not in parse_etags(if_range):
+        return None
+    return parse_range(request.headers.get('Range'), size)
+
+
+def _content_type(name):
+    content_type, _ = mimetypes.guess_type(name)
+    return content_type or 'application/octet-stream'
+
+
+def _file_response(request, name, file_path, etag, size):
+    try:
+        byte_range = _range_for(request, etag, size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range is None:
+        return FileResponse(file_path.open('rb'))
+    start, end = byte_range
+    response = StreamingHttpResponse(
+        _read_range(file_path.open('rb'), start, end - start + 1),
+        status=206,
+        content_type=_content_type(name)
+    )
+    response['Content-Length'] = end - start + 1
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
+
+
+def _sendfile_response(name, file_path):
+    response = HttpResponse()
+    if settings.BLOG_MEDIA_SENDFILE == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = quote(
+            settings.BLOG_MEDIA_ACCEL_PREFIX + name
+        )
+    else:
+        response['X-Sendfile'] = str(file_path)
+    response['Content-Type'] = _content_type(name)
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    name, file_path = _file_path(path)
+    stat = file_path.stat()
+    etag = _etag(stat)
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        if settings.BLOG_MEDIA_SENDFILE:
+            response = _sendfile_response(name, file_path)
+        else:
+            response = _file_response(
+                request, name, file_path, etag, stat.st_size
+            )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    if IMMUTABLE_NAME.match(name):
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
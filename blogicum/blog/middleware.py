@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .publication import publish_if_due
+
+
+class ScheduledPublicationMiddleware:
+    """Публикует отложенные посты, чья pub_date уже наступила.
+
+    В обычном запросе это одно чтение из кэша: база опрашивается,
+    только когда срок ближайшей публикации прошёл. При
+    BLOG_PUBLICATION_WORKER = True публикацией занимается команда
+    publish_scheduled --loop, и middleware отключается.
+    """
+
+    def __init__(self, get_response):
+        if settings.BLOG_PUBLICATION_WORKER:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        publish_if_due()
+        return self.get_response(request)
@@ -0,0 +1,38 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:43
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+BATCH_SIZE = 500
+
+
+def fill_excerpts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    last_id = 0
+    while True:
+        batch = list(
+            Post.objects.only('id', 'text').filter(id__gt=last_id)
+            .order_by('id')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for post in batch:
+            post.excerpt = Truncator(post.text).words(10, truncate=' …')
+        Post.objects.bulk_update(batch, ['excerpt'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Анонс'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(blank=True, default=0, verbose_name='Количество комментариев'),
+        ),
+    ]
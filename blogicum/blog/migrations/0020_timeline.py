@@ -0,0 +1,101 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+BATCH_SIZE = 500
+
+
+def fill_timeline(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    TimelineEntry = apps.get_model('blog', 'TimelineEntry')
+    last_id = 0
+    while True:
+        batch = list(
+            Post.objects.select_related('author', 'category', 'location')
+            .defer('text').filter(id__gt=last_id, is_visible=True)
+            .order_by('id')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        TimelineEntry.objects.bulk_create(
+            TimelineEntry(
+                post_id=post.id,
+                pub_date=post.pub_date,
+                title=post.title,
+                excerpt=post.excerpt,
+                image=post.image.name,
+                author_id=post.author_id,
+                author_username=post.author.username,
+                category_id=post.category_id,
+                category_slug=post.category.slug,
+                category_title=post.category.title,
+                location_name=(
+                    post.location.name
+                    if post.location is not None
+                    and post.location.is_published else ''
+                ),
+                comment_count=post.comment_count,
+                updated_at=post.updated_at,
+            )
+            for post in batch
+        )
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0019_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='timeline_entry', serialize=False, to='blog.post')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата и время публикации')),
+                ('title', models.CharField(max_length=256, verbose_name='Заголовок')),
+                ('excerpt', models.TextField(blank=True, verbose_name='Анонс')),
+                ('image', models.ImageField(blank=True, upload_to='posts_images', verbose_name='Изображение')),
+                ('author_id', models.BigIntegerField(verbose_name='Автор')),
+                ('author_username', models.CharField(max_length=150, verbose_name='Имя автора')),
+                ('category_id', models.BigIntegerField(verbose_name='Категория')),
+                ('category_slug', models.SlugField(db_index=False, verbose_name='Идентификатор категории')),
+                ('category_title', models.CharField(max_length=256, verbose_name='Категория')),
+                ('location_name', models.CharField(blank=True, max_length=256, verbose_name='Название места')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Количество комментариев')),
+                ('updated_at', models.DateTimeField(verbose_name='Изменено')),
+            ],
+            options={
+                'verbose_name': 'запись ленты',
+                'verbose_name_plural': 'Лента',
+                'ordering': ('-pub_date',),
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_visible_pub_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_visible_category_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_visible_author_idx',
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['pub_date', 'post'], name='timeline_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['category_id', 'pub_date', 'post'], name='timeline_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['author_id', 'pub_date', 'post'], name='timeline_author_idx'),
+        ),
+        migrations.RunPython(fill_timeline, migrations.RunPython.noop),
+    ]
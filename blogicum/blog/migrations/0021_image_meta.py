@@ -0,0 +1,23 @@
+# Generated by Django 3.2.16 on 2026-10-18 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0020_timeline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Размеры и копии изображения'),
+        ),
+        migrations.AddField(
+            model_name='timelineentry',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Размеры и копии изображения'),
+        ),
+    ]
@@ -1,9 +1,24 @@
+from types import SimpleNamespace
+
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.text import Truncator
+
+from . import routes
+from .caching import feed_version, post_feed
+from .images import ResponsiveImageMixin, read_dimensions
+from .storage import post_images_storage
 
 User = get_user_model()
+EXCERPT_WORDS = 10
+VISIBILITY_FIELDS = {'is_published', 'pub_date', 'category'}
+
+
+def make_excerpt(text):
+    """Анонс поста: то же, что фильтр truncatewords:EXCERPT_WORDS."""
+    return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
 
 
 class CoreModel(models.Model):
@@ -53,9 +68,42 @@ class Location(CoreModel):
         return self.name
 
 
-class Post(CoreModel):
+class CardUrlsMixin:
+    """Адреса из карточки поста без обхода резолвера.
+
+    Ленты раздают постам общую таблицу адресов (routes.attach),
+    отдельный пост создаёт её сам. card_version — ключ кэша карточки.
+    """
+
+    route_table = None
+
+    def _routes(self):
+        return self.route_table or routes.current()
+
+    @property
+    def detail_url(self):
+        return self._routes().post_detail_url(self.pk)
+
+    @property
+    def author_url(self):
+        return self._routes().profile_url(self.author.username)
+
+    @property
+    def category_url(self):
+        return self._routes().category_url(self.category.slug)
+
+    @property
+    def card_version(self):
+        # Версия страницы поста сдвигается при любом изменении того, что
+        # видно в карточке: поста, его автора, категории, места и
+        # комментариев (blog.signals).
+        return feed_version(post_feed(self.pk))
+
+
+class Post(CardUrlsMixin, ResponsiveImageMixin, CoreModel):
     title = models.CharField('Заголовок', max_length=256)
     text = models.TextField('Текст')
+    excerpt = models.TextField('Анонс', blank=True, editable=False)
     pub_date = models.DateTimeField(
         'Дата и время публикации',
         default=timezone.now,
@@ -64,13 +112,22 @@ class Post(CoreModel):
             ' — можно делать отложенные публикации.'
         )
     )
-    comment_count = models.PositiveSmallIntegerField(
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+    is_visible = models.BooleanField(
+        'Виден читателям', default=False, editable=False
+    )
+    comment_count = models.PositiveIntegerField(
         'Количество комментариев', default=0, blank=True
     )
     image = models.ImageField(
         'Изображение',
         blank=True,
-        upload_to='posts_images'
+        upload_to='posts_images',
+        storage=post_images_storage
+    )
+    image_meta = models.JSONField(
+        'Размеры и копии изображения', default=dict, blank=True,
+        editable=False
     )
     author = models.ForeignKey(
         User,
@@ -95,6 +152,82 @@ class Post(CoreModel):
     def __str__(self) -> str:
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Категория на момент загрузки: по ней сигналы находят ленту,
+        # из которой пост уходит при смене категории.
+        instance._loaded_category_id = instance.__dict__.get('category_id')
+        instance._loaded_image = instance.__dict__.get('image')
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if 'text' not in self.get_deferred_fields():
+            self.excerpt = make_excerpt(self.text)
+            if update_fields is not None and 'text' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'image' in update_fields:
+            self.refresh_image_meta()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'image_meta'}
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or VISIBILITY_FIELDS & set(update_fields):
+            self.is_visible = self.compute_is_visible()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'is_visible'}
+        super().save(*args, **kwargs)
+
+    def refresh_image_meta(self):
+        """Записывает размеры изображения, если оно заменено.
+
+        Копии изображения делаются после сохранения поста вне запроса
+        (см. blog.image_processing), а до тех пор image_meta содержит
+        только размеры оригинала. Новый файл сохраняется в хранилище
+        здесь, чтобы прочитать их до записи модели. Если тот же файл
+        уже загружен в другой пост, его копии используются повторно.
+        Файл, сохранённый в откаченной транзакции, остаётся без ссылок,
+        его удаляет команда sweep_images.
+        """
+        if 'image' in self.get_deferred_fields():
+            return
+        image = self.image
+        if image and not image._committed:
+            image.save(image.name, image.file, save=False)
+        previous = getattr(self, '_loaded_image', None)
+        if previous and previous != image.name:
+            self._released_images = [
+                *getattr(self, '_released_images', ()), previous
+            ]
+        if not image:
+            self.image_meta = {}
+        elif image.name != previous:
+            self.image_meta = self.shared_image_meta() or read_dimensions(
+                image
+            )
+            self._image_changed = 'variants' not in self.image_meta
+        self._loaded_image = image.name
+
+    def shared_image_meta(self):
+        """image_meta с готовыми копиями у другого поста с тем же файлом."""
+        return Post.objects.filter(
+            image=self.image.name, image_meta__has_key='variants'
+        ).exclude(pk=self.pk).values_list('image_meta', flat=True).first()
+
+    def compute_is_visible(self):
+        """Правило видимости поста читателям.
+
+        Сохранённый результат поддерживают сигналы категории и
+        публикация отложенных постов (blog.publication).
+        """
+        return (
+            self.is_published
+            and self.pub_date <= timezone.now()
+            and self.category is not None
+            and self.category.is_published
+        )
+
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={'post_id': self.pk})
 
@@ -102,6 +235,130 @@ class Post(CoreModel):
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date', )
+        indexes = (
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_published=True, is_visible=False),
+                name='post_pending_pub_date_idx'
+            ),
+            # Число ссылок на файл изображения (blog.image_processing).
+            models.Index(fields=('image',), name='post_image_idx'),
+        )
+
+
+class TimelineEntry(CardUrlsMixin, ResponsiveImageMixin, models.Model):
+    """Копия видимого поста с тем, что нужно его карточке в ленте.
+
+    Ленты читают только эту таблицу, без соединений с автором,
+    категорией и местом. Записи поддерживает blog.timeline.
+    Атрибуты author, category и location повторяют интерфейс Post,
+    поэтому карточка рендерится тем же шаблоном.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='timeline_entry'
+    )
+    pub_date = models.DateTimeField('Дата и время публикации')
+    title = models.CharField('Заголовок', max_length=256)
+    excerpt = models.TextField('Анонс', blank=True)
+    image = models.ImageField(
+        'Изображение', blank=True, upload_to='posts_images'
+    )
+    image_meta = models.JSONField(
+        'Размеры и копии изображения', default=dict, blank=True
+    )
+    author_id = models.BigIntegerField('Автор')
+    author_username = models.CharField('Имя автора', max_length=150)
+    category_id = models.BigIntegerField('Категория')
+    category_slug = models.SlugField('Идентификатор категории',
+                                     db_index=False)
+    category_title = models.CharField('Категория', max_length=256)
+    location_name = models.CharField(
+        'Название места', max_length=256, blank=True
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев', default=0
+    )
+    updated_at = models.DateTimeField('Изменено')
+
+    is_published = True
+
+    class Meta:
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'Лента'
+        ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('pub_date', 'post'),
+                name='timeline_pub_date_idx'
+            ),
+            models.Index(
+                fields=('category_id', 'pub_date', 'post'),
+                name='timeline_category_idx'
+            ),
+            models.Index(
+                fields=('author_id', 'pub_date', 'post'),
+                name='timeline_author_idx'
+            ),
+        )
+
+    def __str__(self) -> str:
+        return self.title
+
+    @classmethod
+    def from_post(cls, post):
+        location = post.location
+        return cls(
+            post_id=post.pk,
+            pub_date=post.pub_date,
+            title=post.title,
+            excerpt=post.excerpt,
+            image=post.image.name,
+            image_meta=post.image_meta,
+            author_id=post.author_id,
+            author_username=post.author.username,
+            category_id=post.category_id,
+            category_slug=post.category.slug,
+            category_title=post.category.title,
+            location_name=(
+                location.name
+                if location is not None and location.is_published else ''
+            ),
+            comment_count=post.comment_count,
+            updated_at=post.updated_at,
+        )
+
+    @property
+    def id(self):
+        return self.post_id
+
+    @property
+    def author(self):
+        return SimpleNamespace(
+            pk=self.author_id, username=self.author_username
+        )
+
+    @property
+    def category(self):
+        return SimpleNamespace(
+            pk=self.category_id,
+            slug=self.category_slug,
+            title=self.category_title,
+            is_published=True,
+        )
+
+    @property
+    def location(self):
+        if not self.location_name:
+            return None
+        return SimpleNamespace(name=self.location_name, is_published=True)
 
 
 class Comment(models.Model):
@@ -122,3 +379,9 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_at_idx'
+            ),
+        )
@@ -0,0 +1,209 @@
+from collections.abc import Sequence
+from datetime import datetime
+
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.encoding import force_str
+from django.utils.functional import cached_property
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from .caching import get_feed_count
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(date, pk):
+    """Упаковывает ключ записи (дата, id) в непрозрачный токен для URL."""
+    raw = f'{date.isoformat()}|{pk}'
+    return urlsafe_base64_encode(raw.encode())
+
+
+def decode_cursor(token):
+    try:
+        date, pk = force_str(urlsafe_base64_decode(token)).split('|')
+        return datetime.fromisoformat(date), int(pk)
+    except (TypeError, ValueError) as error:
+        raise InvalidCursor(token) from error
+
+
+PAGE_LINKS_ON_EACH_SIDE = 2
+PAGE_LINKS_ON_ENDS = 1
+
+
+class FeedPage(Page):
+    """Нумерованная страница, дополнительно отдающая курсоры соседей.
+
+    Ссылки «вперёд/назад» ведут в режим KeysetPaginator, так что обход
+    ленты подряд не опускается до глубоких OFFSET.
+    """
+
+    @cached_property
+    def page_links(self):
+        """Номера страниц для навигации: края и окно вокруг текущей.
+
+        Пропуски обозначены Paginator.ELLIPSIS, так что число ссылок
+        не зависит от общего числа страниц.
+        """
+        return list(self.paginator.get_elided_page_range(
+            self.number,
+            on_each_side=PAGE_LINKS_ON_EACH_SIDE,
+            on_ends=PAGE_LINKS_ON_ENDS
+        ))
+
+    @property
+    def next_cursor(self):
+        if self.has_next() and self.object_list:
+            return encode_cursor(self[-1].pub_date, self[-1].pk)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous() and self.object_list:
+            return encode_cursor(self[0].pub_date, self[0].pk)
+        return None
+
+
+class FeedPaginator(Paginator):
+    """Пагинатор ленты с кэшированным числом публикаций.
+
+    Число записей хранится в кэше под версией ленты feed и пересчитывается
+    только после её изменения или наступления отложенной публикации.
+    variant различает выборки одной ленты (например, с черновиками автора).
+    """
+
+    def __init__(self, object_list, per_page, feed=None, variant='public',
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.feed = feed
+        self.variant = variant
+
+    @cached_property
+    def count(self):
+        if self.feed is None:
+            return Paginator.count.func(self)
+        return get_feed_count(
+            self.feed, self.variant, lambda: Paginator.count.func(self)
+        )
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
+
+
+class KeysetPaginator:
+    """Пагинатор по ключу (date_field, id) без COUNT(*) и OFFSET.
+
+    Каждая страница выбирается условием «строго после/до курсора»
+    по составному ключу, поэтому стоимость глубокой страницы
+    равна стоимости первой.
+    """
+
+    num_pages = None
+
+    def __init__(self, object_list, per_page, date_field='pub_date',
+                 descending=True):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.date_field = date_field
+        self.descending = descending
+
+    def _ordering(self, reverse=False):
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        return f'{prefix}{self.date_field}', f'{prefix}pk'
+
+    def _seek(self, cursor, forward):
+        date, pk = cursor
+        lookup = 'lt' if forward == self.descending else 'gt'
+        # Нестрогая граница по дате отдельным условием позволяет СУБД
+        # начать диапазонный поиск по индексу прямо с курсора.
+        return Q(**{f'{self.date_field}__{lookup}e': date}) & (
+            Q(**{f'{self.date_field}__{lookup}': date})
+            | Q(**{f'pk__{lookup}': pk})
+        )
+
+    def cursor_for(self, obj):
+        return encode_cursor(getattr(obj, self.date_field), obj.pk)
+
+    def get_page(self, after=None, before=None):
+        """Возвращает страницу после курсора after или перед before.
+
+        Пустая строка в before означает последнюю страницу,
+        некорректный токен — первую.
+        """
+        try:
+            if before is not None:
+                cursor = decode_cursor(before) if before else None
+                return self._page_before(cursor)
+            cursor = decode_cursor(after) if after else None
+        except InvalidCursor:
+            cursor = None
+        return self._page_after(cursor)
+
+    def _page_after(self, cursor):
+        queryset = self.object_list.order_by(*self._ordering())
+        if cursor is not None:
+            queryset = queryset.filter(self._seek(cursor, forward=True))
+        items = list(queryset[:self.per_page + 1])
+        return KeysetPage(
+            items[:self.per_page],
+            self,
+            has_next=len(items) > self.per_page,
+            has_previous=cursor is not None,
+        )
+
+    def _page_before(self, cursor):
+        queryset = self.object_list.order_by(*self._ordering(reverse=True))
+        if cursor is not None:
+            queryset = queryset.filter(self._seek(cursor, forward=False))
+        items = list(queryset[:self.per_page + 1])
+        return KeysetPage(
+            items[:self.per_page][::-1],
+            self,
+            has_next=cursor is not None,
+            has_previous=len(items) > self.per_page,
+        )
+
+
+class KeysetPage(Sequence):
+    """Страница KeysetPaginator с интерфейсом django.core.paginator.Page."""
+
+    number = None
+    page_links = ()
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<Keyset page of {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return self.paginator.cursor_for(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return self.paginator.cursor_for(self.object_list[0])
+        return None
@@ -0,0 +1,87 @@
+"""Материализованная видимость постов и отложенная публикация.
+
+Post.is_visible хранит результат правила «опубликован, pub_date
+наступила, категория опубликована». Сохранение поста пересчитывает его
+само, изменения категории и наступление pub_date обрабатываются здесь.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Min
+from django.dispatch import Signal
+from django.utils import timezone
+
+NEXT_PUBLICATION_KEY = 'next-publication'
+_MISSING = object()
+
+# Отправляется после того, как отложенные посты стали видимыми;
+# post_ids — их первичные ключи.
+post_published = Signal()
+
+
+def pending_posts():
+    from .models import Post
+
+    return Post.objects.filter(
+        is_published=True, is_visible=False, category__is_published=True
+    )
+
+
+def next_publication():
+    """Самая ранняя pub_date среди ждущих публикации постов или None."""
+    value = cache.get(NEXT_PUBLICATION_KEY, _MISSING)
+    if value is _MISSING:
+        value = pending_posts().aggregate(Min('pub_date'))['pub_date__min']
+        cache.set(
+            NEXT_PUBLICATION_KEY, value,
+            timeout=settings.BLOG_FEED_CACHE_TIMEOUT
+        )
+    return value
+
+
+def forget_next_publication():
+    cache.delete(NEXT_PUBLICATION_KEY)
+
+
+def publish_due_posts(now=None):
+    """Делает видимыми посты, чья pub_date наступила, и отправляет
+    post_published. Возвращает число опубликованных постов.
+    """
+    from .models import Post
+
+    now = now or timezone.now()
+    with transaction.atomic():
+        due = list(
+            pending_posts().filter(pub_date__lte=now)
+            .select_for_update(of=('self',)).values_list('pk', flat=True)
+        )
+        if due:
+            Post.objects.filter(pk__in=due).update(is_visible=True)
+    forget_next_publication()
+    if due:
+        post_published.send(sender=Post, post_ids=due)
+    return len(due)
+
+
+def publish_if_due():
+    """Вызывается из ScheduledPublicationMiddleware, если публикацию
+    не ведёт отдельный процесс (BLOG_PUBLICATION_WORKER).
+    """
+    due = next_publication()
+    if due is not None and due <= timezone.now():
+        publish_due_posts()
+
+
+def refresh_category_posts(category):
+    """Пересчитывает видимость постов категории после её изменения."""
+    from .models import Post
+
+    now = timezone.now()
+    posts = Post.objects.filter(category=category)
+    if not category.is_published:
+        posts.update(is_visible=False)
+        return
+    posts.filter(is_published=True, pub_date__lte=now).update(
+        is_visible=True
+    )
+    forget_next_publication()
@@ -0,0 +1,201 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from . import lookups
+from .caching import (
+    INDEX_FEED, category_feed, post_feed, post_feeds, posts_feeds,
+    profile_feed, touch_feeds
+)
+from .image_processing import release_after_commit, schedule_variants
+from .models import Category, Comment, Location, Post, TimelineEntry
+from .publication import (
+    forget_next_publication, post_published, refresh_category_posts
+)
+from .timeline import refresh_posts_timeline, refresh_timeline, sync_post
+
+User = get_user_model()
+
+
+def _category_feeds(category):
+    return {INDEX_FEED, category_feed(category.slug)} | posts_feeds(
+        Post.objects.filter(category=category)
+    )
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_feeds(sender, instance, raw=False, **kwargs):
+    """Запоминает ленты поста до сохранения: он мог сменить категорию.
+
+    Для загруженного из базы поста достаточно прежнего category_id,
+    иначе прежнее состояние перечитывается.
+    """
+    instance._previous_feeds = set()
+    if raw or instance.pk is None:
+        return
+    if hasattr(instance, '_loaded_category_id'):
+        category_id = instance._loaded_category_id
+        if category_id is not None and category_id != instance.category_id:
+            instance._previous_feeds = {
+                category_feed(slug) for slug in Category.objects.filter(
+                    pk=category_id
+                ).values_list('slug', flat=True)
+            }
+        return
+    previous = Post.objects.select_related('author', 'category').filter(
+        pk=instance.pk
+    ).first()
+    if previous is not None:
+        instance._previous_feeds = post_feeds(previous)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    forget_next_publication()
+    instance._loaded_category_id = instance.category_id
+    touch_feeds(
+        getattr(instance, '_previous_feeds', set()) | post_feeds(instance)
+    )
+
+
+@receiver(post_save, sender=Post)
+def sync_post_timeline(sender, instance, raw=False, **kwargs):
+    # Запись удалённого поста удаляется каскадом.
+    if not raw:
+        sync_post(instance)
+
+
+@receiver(post_save, sender=Post)
+def queue_image_variants(sender, instance, raw=False, **kwargs):
+    if not raw and getattr(instance, '_image_changed', False):
+        instance._image_changed = False
+        schedule_variants(instance)
+
+
+@receiver(post_save, sender=Post)
+def release_replaced_images(sender, instance, raw=False, **kwargs):
+    if not raw:
+        release_after_commit(instance.__dict__.pop('_released_images', ()))
+
+
+@receiver(post_delete, sender=Post)
+def release_deleted_image(sender, instance, **kwargs):
+    if instance.image:
+        release_after_commit([instance.image.name])
+
+
+@receiver(post_published, sender=Post)
+def invalidate_published_feeds(sender, post_ids, **kwargs):
+    refresh_timeline(post_ids)
+    touch_feeds(posts_feeds(Post.objects.filter(pk__in=post_ids)))
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def remember_category_feeds(sender, instance, raw=False, **kwargs):
+    """Запоминает ленты категории до изменения.
+
+    После удаления категории её посты уже отвязаны (SET_NULL),
+    поэтому авторов приходится собирать заранее.
+    """
+    instance._previous_feeds = set()
+    if not raw and instance.pk is not None:
+        previous = Category.objects.filter(pk=instance.pk).first()
+        if previous is not None:
+            instance._previous_feeds = _category_feeds(previous)
+
+
+@receiver(post_save, sender=Category)
+def invalidate_category_feeds(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_category_posts(instance)
+        refresh_posts_timeline(Post.objects.filter(category=instance))
+        touch_feeds(instance._previous_feeds | _category_feeds(instance))
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    # Посты удаляемой категории остаются без категории и скрываются.
+    Post.objects.filter(category=instance).update(is_visible=False)
+    TimelineEntry.objects.filter(category_id=instance.pk).delete()
+
+
+@receiver(post_delete, sender=Category)
+def invalidate_deleted_category_feeds(sender, instance, **kwargs):
+    touch_feeds(instance._previous_feeds)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_feeds(sender, instance, raw=False, **kwargs):
+    # Карточки в лентах показывают число комментариев.
+    if not raw:
+        touch_feeds(posts_feeds(Post.objects.filter(pk=instance.post_id)))
+
+
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def invalidate_location_feeds(sender, instance, raw=False, **kwargs):
+    if not raw:
+        posts = Post.objects.filter(location=instance)
+        instance._post_ids = list(posts.values_list('pk', flat=True))
+        touch_feeds(posts_feeds(posts))
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def sync_location_timeline(sender, instance, raw=False, **kwargs):
+    # После удаления места посты уже отвязаны от него (SET_NULL),
+    # поэтому их список запоминается заранее.
+    if not raw:
+        refresh_timeline(instance._post_ids)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_lookups(sender, raw=False, **kwargs):
+    # После коммита: иначе параллельный запрос успел бы прочитать
+    # старые строки под новой версией.
+    if not raw:
+        transaction.on_commit(lookups.invalidate)
+
+
+@receiver(pre_save, sender=User)
+def remember_user_feeds(sender, instance, raw=False, update_fields=None,
+                        **kwargs):
+    instance._previous_feeds = set()
+    if raw or instance.pk is None or update_fields == {'last_login'}:
+        return
+    username = User.objects.filter(pk=instance.pk).values_list(
+        'username', flat=True
+    ).first()
+    if username is not None:
+        instance._previous_feeds = {profile_feed(username)}
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_feeds(sender, instance, created, raw=False,
+                          update_fields=None, **kwargs):
+    """Имя автора видно в его постах, их лентах и в комментариях.
+
+    Обновление last_login при каждом входе страницы не меняет.
+    """
+    if raw or created or update_fields == {'last_login'}:
+        return
+    posts = Post.objects.filter(author=instance)
+    refresh_posts_timeline(posts)
+    commented = Post.objects.filter(comment__author=instance)
+    touch_feeds(
+        instance._previous_feeds
+        | {profile_feed(instance.username)}
+        | posts_feeds(posts)
+        | {post_feed(pk) for pk in commented.values_list('pk', flat=True)}
+    )
@@ -0,0 +1,98 @@
+"""Хранилище изображений постов с адресацией по содержимому.
+
+Файл сохраняется под именем <каталог>/<ab>/<sha256><расширение>, где
+sha256 считается по ходу записи. Одинаковые загрузки попадают в один
+файл, а содержимое файла под данным именем никогда не меняется.
+Ссылки на файл считаются по Post.image (blog.image_processing).
+
+Повторная загрузка существующего файла обновляет его mtime, а файл без
+ссылок удаляется, только если его давно не трогали: пост, который
+использовал файл повторно, но ещё не закоммичен, не теряет его.
+"""
+import hashlib
+import os
+import posixpath
+import tempfile
+import time
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+# Права по умолчанию для файлов, созданных через tempfile (0o600).
+DEFAULT_FILE_MODE = 0o644
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+
+    def get_available_name(self, name, max_length=None):
+        # Имя задаёт содержимое файла: совпадение имён — это совпадение
+        # файлов, а не конфликт.
+        return name
+
+    def blob_name(self, name, digest):
+        directory, filename = posixpath.split(name)
+        extension = posixpath.splitext(filename)[1].lower()
+        return posixpath.join(directory, digest[:2], digest + extension)
+
+    def _save(self, name, content):
+        directory = self.path(posixpath.dirname(name))
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+            name = self.blob_name(name, digest.hexdigest())
+            if self.touch(name):
+                os.remove(temp_path)
+                return name
+            path = self.path(name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.chmod(
+                temp_path, self.file_permissions_mode or DEFAULT_FILE_MODE
+            )
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
+
+    def touch(self, name):
+        """Отмечает файл name использованным; False, если его нет."""
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def delete_unused(self, name, grace):
+        """Удаляет файл name, если его не трогали grace секунд.
+
+        Перед удалением файл переименовывается. touch, успевший до
+        этого, виден по mtime, и файл возвращается на место; touch
+        после переименования файла не находит, и _save пишет его заново.
+        """
+        path = self.path(name)
+        deadline = time.time() - grace
+        released = f'{path}.{uuid.uuid4().hex}.released'
+        try:
+            if os.stat(path).st_mtime > deadline:
+                return False
+            os.replace(path, released)
+        except FileNotFoundError:
+            return False
+        if os.stat(released).st_mtime > deadline:
+            # Содержимое то же, поэтому файл, записанный заново, можно
+            # перезаписать.
+            os.replace(released, path)
+            return False
+        os.remove(released)
+        return True
+
+
+post_images_storage = ContentAddressedStorage()
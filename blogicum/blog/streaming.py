@@ -0,0 +1,60 @@
+"""Потоковая отдача страниц лент (BLOG_STREAM_FEEDS).
+
+Шаблон страницы рендерится с меткой вместо ленты: всё до метки, то
+есть <head> и шапка, уходит клиенту сразу. Затем карточки
+рендерятся по одной по мере чтения выборки, последними идут пагинатор
+и остаток страницы.
+"""
+from uuid import uuid4
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.shortcuts import render
+from django.template.loader import get_template, render_to_string
+
+from . import routes
+
+STREAM_MARKER = uuid4().hex
+
+
+def iterate_page(page_obj):
+    # Выборку страницы с OFFSET читаем курсором, не собирая в список.
+    object_list = page_obj.object_list
+    if hasattr(object_list, 'iterator'):
+        return object_list.iterator()
+    return iter(object_list)
+
+
+def stream_feed(request, template_name, context):
+    page_obj = context['page_obj']
+    head, tail = render_to_string(
+        template_name, {**context, 'stream_marker': STREAM_MARKER}, request
+    ).split(STREAM_MARKER)
+    yield head
+    table = routes.current()
+    item = get_template('includes/feed_item.html')
+    posts = []
+    for post in iterate_page(page_obj):
+        post.route_table = table
+        posts.append(post)
+        yield item.render({'post': post})
+    # Курсоры пагинатора берутся из уже прочитанных постов.
+    page_obj.object_list = posts
+    yield get_template('includes/paginator.html').render(
+        {'page_obj': page_obj}
+    )
+    yield tail
+
+
+def render_feed(request, template_name, context):
+    """render() для страниц лент с потоковым режимом по настройке."""
+    if not settings.BLOG_STREAM_FEEDS:
+        routes.attach(context['page_obj'])
+        return render(request, template_name, context)
+    # Сессия должна быть прочитана до ответа middleware, иначе
+    # SessionMiddleware не добавит Vary: Cookie.
+    request.user.is_authenticated
+    return StreamingHttpResponse(
+        stream_feed(request, template_name, context),
+        content_type='text/html; charset=utf-8'
+    )
@@ -0,0 +1,6 @@
+from django import template
+
+from blogicum.staticfiles import bootstrap_stylesheet
+
+register = template.Library()
+register.simple_tag(bootstrap_stylesheet)
@@ -0,0 +1,56 @@
+"""Поддержка таблицы TimelineEntry.
+
+Запись есть у каждого видимого поста. После любого изменения, которое
+может затронуть карточку, записи затронутых постов пересобираются
+целиком: они небольшие, а правило остаётся одним.
+"""
+from django.db import transaction
+
+from .models import Post, TimelineEntry
+
+BATCH_SIZE = 500
+
+
+def refresh_timeline(post_ids):
+    """Пересобирает записи ленты для постов post_ids."""
+    post_ids = list(post_ids)
+    if not post_ids:
+        return
+    visible = Post.objects.select_related(
+        'author', 'category', 'location'
+    ).defer('text').filter(pk__in=post_ids, is_visible=True)
+    with transaction.atomic():
+        TimelineEntry.objects.filter(post_id__in=post_ids).delete()
+        TimelineEntry.objects.bulk_create(
+            (TimelineEntry.from_post(post) for post in visible),
+            batch_size=BATCH_SIZE
+        )
+
+
+def sync_post(post):
+    """Обновляет запись ленты по уже загруженному посту."""
+    if post.is_visible:
+        TimelineEntry.from_post(post).save()
+    else:
+        TimelineEntry.objects.filter(post_id=post.pk).delete()
+
+
+def refresh_posts_timeline(posts):
+    """То же для выборки постов."""
+    refresh_timeline(posts.values_list('pk', flat=True))
+
+
+def rebuild_timeline():
+    """Заполняет таблицу заново по всем постам. Возвращает число записей."""
+    TimelineEntry.objects.all().delete()
+    last_id = 0
+    while True:
+        ids = list(
+            Post.objects.filter(pk__gt=last_id, is_visible=True)
+            .order_by('pk').values_list('pk', flat=True)[:BATCH_SIZE]
+        )
+        if not ids:
+            break
+        refresh_timeline(ids)
+        last_id = ids[-1]
+    return TimelineEntry.objects.count()
@@ -33,6 +33,11 @@ urlpatterns = [
         views.DeletePostView.as_view(),
         name='delete_post'
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path(
         'posts/<int:post_id>/comment/',
         views.add_comment,
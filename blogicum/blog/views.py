@@ -4,117 +4,164 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.core.exceptions import PermissionDenied
-from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.db.models.base import Model as Model
+from django.http import Http404
 from django.http.response import HttpResponseRedirect
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
-from django.utils import timezone
 from django.views import generic
 
+from .caching import (
+    INDEX_FEED, cache_anonymous_page, category_feed, conditional_page,
+    post_feed, profile_feed
+)
 from .forms import CommentForm, CreatePostForm, UserEditForm
-from .models import Category, Comment, Post
+from .lookups import published_category, with_lookups
+from .models import Comment, Post, TimelineEntry
+from .paginators import FeedPaginator, KeysetPaginator
+from .streaming import render_feed
 
 User = get_user_model()
-join_parameters = ('location', 'author', 'category')
 POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 50
+FEED_ORDERING = ('-pub_date', '-pk')
 
 
-def get_posts_qs(posts, *joins, **filters):
-    return posts.select_related(*joins).filter(
-        pub_date__lte=timezone.now(),
-        is_published=True,
-        **filters
-    )
+def get_timeline_qs(**filters):
+    # Публичные ленты читают только таблицу видимых постов.
+    return TimelineEntry.objects.filter(**filters)
 
 
-def get_page_obj(object, posts_per_page, request):
+def get_page_obj(object, posts_per_page, request, feed=None,
+                 variant='public'):
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    if after is not None or before is not None:
+        paginator = KeysetPaginator(object, posts_per_page)
+        return paginator.get_page(after=after, before=before)
     page_number = request.GET.get('page')
-    paginator = Paginator(object, posts_per_page)
+    paginator = FeedPaginator(
+        object.order_by(*FEED_ORDERING), posts_per_page, feed, variant
+    )
     return paginator.get_page(page_number)
 
 
+@conditional_page(lambda: [INDEX_FEED])
+@cache_anonymous_page(lambda: [INDEX_FEED])
 def index(request):
     template_name = 'blog/index.html'
-    posts = get_posts_qs(
-        Post.objects,
-        *join_parameters,
-        **{'category__is_published': True}
-    )
-    page_obj = get_page_obj(posts, POSTS_PER_PAGE, request)
+    posts = get_timeline_qs()
+    page_obj = get_page_obj(posts, POSTS_PER_PAGE, request, INDEX_FEED)
     context = {'page_obj': page_obj}
-    return render(request, template_name, context)
+    return render_feed(request, template_name, context)
 
 
+@conditional_page(lambda category_slug: [category_feed(category_slug)])
+@cache_anonymous_page(lambda category_slug: [category_feed(category_slug)])
 def category_posts(request, category_slug):
     template_name = 'blog/category.html'
-    category_data = get_object_or_404(
-        Category.objects.filter(
-            is_published=True
-        ),
-        slug=category_slug)
-
-    posts = get_posts_qs(
-        Post.objects,
-        *join_parameters,
-        **{'category__slug': category_slug}
+    category_data = published_category(category_slug)
+    if category_data is None:
+        raise Http404
+
+    posts = get_timeline_qs(category_id=category_data.pk)
+    page_obj = get_page_obj(
+        posts, POSTS_PER_PAGE, request, category_feed(category_slug)
     )
-    page_obj = get_page_obj(posts, POSTS_PER_PAGE, request)
     context = {
         'category': category_data,
         'page_obj': page_obj
     }
-    return render(request, template_name, context)
+    return render_feed(request, template_name, context)
 
 
+@conditional_page(lambda username: [profile_feed(username)])
+@cache_anonymous_page(lambda username: [profile_feed(username)])
 def profile_page(request, username):
     profile = get_object_or_404(User, username=username)
+    variant = 'public'
     if profile == request.user:
-        posts = Post.objects.select_related(
-            *join_parameters
+        variant = 'author'
+        posts = with_lookups(
+            Post.objects.select_related('author').defer('text')
         ).filter(author=profile)
     else:
-        posts = get_posts_qs(
-            Post.objects,
-            *join_parameters,
-            **{'author': profile}
-        )
-    page_obj = get_page_obj(posts, POSTS_PER_PAGE, request)
+        posts = get_timeline_qs(author_id=profile.pk)
+    page_obj = get_page_obj(
+        posts, POSTS_PER_PAGE, request, profile_feed(username), variant
+    )
     context = {
         'profile': profile,
         'page_obj': page_obj
     }
-    return render(request, 'blog/profile.html', context)
+    return render_feed(request, 'blog/profile.html', context)
+
+
+def get_post_for_viewer(request, post_id):
+    post = get_object_or_404(
+        with_lookups(Post.objects.select_related('author')), pk=post_id
+    )
+    if post.author != request.user and not post.is_visible:
+        raise Http404
+    return post
+
+
+def get_comments_page(post, after=None):
+    paginator = KeysetPaginator(
+        post.comment.select_related('author'),
+        COMMENTS_PER_PAGE,
+        date_field='created_at',
+        descending=False
+    )
+    return paginator.get_page(after=after)
 
 
+@conditional_page(lambda post_id: [post_feed(post_id)])
+@cache_anonymous_page(lambda post_id: [post_feed(post_id)])
 def post_detail(request, post_id):
     template_name = 'blog/detail.html'
-    post = get_object_or_404(Post.objects.select_related(
-        'location', 'author', 'category'
-    ), pk=post_id)
-    if post.author != request.user:
-        post = get_object_or_404(
-            Post.objects.select_related(
-                'location', 'author', 'category'
-            ).exclude(
-                Q(pub_date__gte=timezone.now())
-                | Q(is_published=False)
-                | Q(category__is_published=False)
-            ),
-            pk=post_id
-        )
+    post = get_post_for_viewer(request, post_id)
     context = {'post': post}
     context['form'] = CommentForm()
-    context['comments'] = post.comment.select_related('author')
+    context['comments'] = get_comments_page(post)
     return render(request, template_name, context)
 
 
-class OnlyAuthorMixin(UserPassesTestMixin):
+@conditional_page(lambda post_id: [post_feed(post_id)])
+@cache_anonymous_page(lambda post_id: [post_feed(post_id)])
+def post_comments(request, post_id):
+    """Следующая порция комментариев для кнопки «Показать ещё»."""
+    post = get_post_for_viewer(request, post_id)
+    context = {
+        'post': post,
+        'comments': get_comments_page(post, request.GET.get('after'))
+    }
+    return render(request, 'includes/comment_list.html', context)
+
+
+class CachedObjectMixin:
+    """Загружает объект view один раз за запрос.
+
+    Экземпляр view создаётся заново на каждый запрос, поэтому
+    запомненный объект живёт ровно столько же, сколько запрос.
+    """
+
+    def get_object(self, queryset=None) -> Model:
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_cached_object'):
+            self._cached_object = super().get_object()
+        return self._cached_object
+
+
+class OnlyAuthorMixin(CachedObjectMixin, UserPassesTestMixin):
 
     def test_func(self) -> bool:
         object = self.get_object()
-        return object.author == self.request.user
+        return object.author_id == self.request.user.id
 
 
 class GetSuccessURLMixin:
@@ -170,22 +217,33 @@ class DeletePostView(OnlyAuthorMixin, generic.DeleteView):
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        instance = get_object_or_404(Post, pk=self.object.id)
-        context['form'] = CreatePostForm(instance=instance)
+        context['form'] = CreatePostForm(instance=self.object)
         return context
 
 
+def change_comment_count(post_id, delta):
+    """Сдвигает счётчик комментариев одним UPDATE только этих полей.
+
+    Инкремент выполняется в базе через F(), поэтому параллельные
+    комментарии не затирают друг друга, а правки автора поста — счётчик.
+    """
+    for model in (Post, TimelineEntry):
+        model.objects.filter(pk=post_id).update(
+            comment_count=Greatest(F('comment_count') + delta, 0)
+        )
+
+
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(Post.objects.only('id'), pk=post_id)
     form = CommentForm(request.POST)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
-        post.comment_count = post.comment.count()
-        post.save()
+        with transaction.atomic():
+            comment.save()
+            change_comment_count(post_id, 1)
     return redirect('blog:post_detail', post_id=post_id)
 
 
@@ -208,10 +266,9 @@ def delete_comment(request, post_id, comment_id):
     if comment.author != request.user:
         raise PermissionDenied
     if request.method == 'POST':
-        post = get_object_or_404(Post, pk=post_id)
-        comment.delete()
-        post.comment_count = post.comment.count()
-        post.save()
+        with transaction.atomic():
+            comment.delete()
+            change_comment_count(comment.post_id, -1)
         return redirect('blog:post_detail', post_id=post_id)
     context = {'comment': comment}
     return render(request, 'blog/comment.html', context)
@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_asgi_application()
+
+# После загрузки приложений: шаблоны и маршруты компилируются до
+# первого запроса.
+from blogicum.warmup import warm_up  # noqa: E402
+
+warm_up()
@@ -0,0 +1,64 @@
+"""Окружение Jinja2 для шаблонов из каталога jinja2/.
+
+Повторяет то, чем пользуются шаблоны Django: {% url %}, {% static %},
+{% cache %}, фильтры date и linebreaksbr, теги django_bootstrap5 и
+bootstrap_stylesheet. Значения выводятся так же, как в шаблонах
+Django: даты в текущем часовом поясе и с локализацией.
+"""
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.template.defaultfilters import date, linebreaksbr
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.formats import localize
+from django.utils.safestring import mark_safe
+from django.utils.timezone import template_localtime
+from django_bootstrap5.templatetags.django_bootstrap5 import (
+    bootstrap_button, bootstrap_form
+)
+from jinja2 import Environment
+
+from .staticfiles import bootstrap_stylesheet
+
+
+def url(viewname, *args, **kwargs):
+    return reverse(viewname, args=args or None, kwargs=kwargs or None)
+
+
+def cache_fragment(timeout, fragment_name, *vary_on, caller):
+    """Аналог тега {% cache %}: используется как блок {% call %}.
+
+    К имени фрагмента добавляется суффикс, чтобы не смешивать разметку
+    двух движков в общем кэше.
+    """
+    key = make_template_fragment_key(f'{fragment_name}:jinja2', vary_on)
+    content = cache.get(key)
+    if content is None:
+        content = caller()
+        cache.set(key, content, timeout)
+    return mark_safe(content)
+
+
+def local_date(value, arg=None):
+    return date(template_localtime(value), arg)
+
+
+def finalize(value):
+    return localize(template_localtime(value))
+
+
+def environment(**options):
+    env = Environment(finalize=finalize, **options)
+    env.globals.update({
+        'url': url,
+        'static': static,
+        'cache_fragment': cache_fragment,
+        'bootstrap_stylesheet': bootstrap_stylesheet,
+        'bootstrap_form': bootstrap_form,
+        'bootstrap_button': bootstrap_button,
+    })
+    env.filters.update({
+        'date': local_date,
+        'linebreaksbr': linebreaksbr,
+    })
+    return env
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,6 +43,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'blog.middleware.ScheduledPublicationMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware'
 ]
 
@@ -49,12 +51,23 @@ ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if not DEBUG:
+    # Compiled templates stay in worker memory; blogicum.warmup fills
+    # the cache before the worker accepts requests.
+    TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    ]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -65,6 +78,29 @@ TEMPLATES = [
     },
 ]
 
+# 'jinja2' renders the blog templates from JINJA2_DIR instead; the
+# optional Jinja2 package must be installed then. Other templates
+# (admin, pages, registration) are still found by DjangoTemplates.
+BLOG_TEMPLATE_ENGINE = 'django'
+
+JINJA2_DIR = BASE_DIR / 'jinja2'
+
+BLOG_JINJA2_TEMPLATES = {
+    'BACKEND': 'django.template.backends.jinja2.Jinja2',
+    'DIRS': [JINJA2_DIR],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        'environment': 'blogicum.jinja2.environment',
+        'context_processors': [
+            'django.template.context_processors.request',
+            'django.contrib.auth.context_processors.auth',
+        ],
+    },
+}
+
+if BLOG_TEMPLATE_ENGINE == 'jinja2':
+    TEMPLATES.insert(0, BLOG_JINJA2_TEMPLATES)
+
 STATICFILES_DIRS = [
     BASE_DIR / 'static_dev',
 ]
@@ -83,6 +119,54 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# Feed versions, cached counts, pages, post cards, ETags and the next
+# publication time are invalidated through this cache, so all processes of
+# the site must share it. The default LocMemCache is per process and suits
+# a single-process setup only; for several workers set, for example,
+# BLOG_CACHE_BACKEND=django.core.cache.backends.memcached.PyMemcacheCache
+# BLOG_CACHE_LOCATION=127.0.0.1:11211
+# or BLOG_CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache with
+# BLOG_CACHE_LOCATION=blog_cache after `manage.py createcachetable`
+LOCAL_CACHE_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('BLOG_CACHE_BACKEND', LOCAL_CACHE_BACKEND),
+        'LOCATION': os.environ.get('BLOG_CACHE_LOCATION', ''),
+    }
+}
+if CACHES['default']['BACKEND'] == LOCAL_CACHE_BACKEND:
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': 10000}
+
+# Seconds a cached feed value (post counts, pages) may live at most
+BLOG_FEED_CACHE_TIMEOUT = 60 * 15
+
+# Seconds a process keeps its copy of categories and locations at most.
+# Changes are announced through CACHES; without a shared cache other
+# processes see them only after this delay
+BLOG_LOOKUPS_MAX_AGE = 60
+
+# True, if deferred posts are published by a separate
+# `manage.py publish_scheduled --loop` process instead of a middleware
+# check on each request. The worker and the site must share CACHES then.
+BLOG_PUBLICATION_WORKER = False
+
+# Processes that make post image variants after the request; with 0
+# they are left to a separate `manage.py process_images --loop` process
+BLOG_IMAGE_WORKERS = 2
+
+# Seconds an unreferenced post image is kept after its last upload: a post
+# that reuses the file may not be committed yet. Older orphans (also from
+# rolled back uploads) are removed by `manage.py sweep_images`
+BLOG_IMAGE_RELEASE_GRACE = 60 * 60
+
+# Stream feed pages: the page head is sent before the posts are read
+BLOG_STREAM_FEEDS = False
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -121,6 +205,13 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+STATIC_ROOT = BASE_DIR / 'collected_static'
+
+if not DEBUG:
+    # Hashed file names, a manifest and .gz/.br copies, built by
+    # `manage.py build_assets` and served by blogicum.staticfiles
+    STATICFILES_STORAGE = 'blogicum.staticfiles.CompressedManifestStorage'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -130,8 +221,17 @@ INTERNAL_IPS = [
     '127.0.0.1'
 ]
 
+MEDIA_URL = '/media/'
+
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Who sends media file bytes: None — Django (FileResponse with ETag and
+# Range), 'x-accel-redirect' — nginx, 'x-sendfile' — Apache/lighttpd
+BLOG_MEDIA_SENDFILE = None
+
+# nginx `internal` location that aliases MEDIA_ROOT, for X-Accel-Redirect
+BLOG_MEDIA_ACCEL_PREFIX = '/protected-media/'
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
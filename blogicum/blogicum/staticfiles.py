@@ -0,0 +1,159 @@
+"""Сборка и раздача статики.
+
+`manage.py build_assets` кладёт Bootstrap в static_dev/vendor/ и
+собирает статику в STATIC_ROOT хранилищем CompressedManifestStorage:
+имена файлов получают хэш содержимого, рядом пишутся сжатые копии
+.gz и .br (если установлен brotli). serve_static отдаёт сжатую копию,
+которую принимает браузер, а файлы с хэшем в имени — с годовым
+неизменяемым кэшем.
+"""
+import gzip
+import mimetypes
+import posixpath
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage, staticfiles_storage
+)
+from django.http import FileResponse, Http404
+from django.templatetags.static import static
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from django.utils.safestring import mark_safe
+from django.views.decorators.http import require_safe
+from django_bootstrap5.html import render_link_tag
+from django_bootstrap5.templatetags.django_bootstrap5 import bootstrap_css
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BOOTSTRAP_DIR = 'vendor/bootstrap'
+BOOTSTRAP_CSS = f'{BOOTSTRAP_DIR}/bootstrap.min.css'
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.json', '.txt', '.ico', '.html'
+)
+# Порядок предпочтения сжатых копий.
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, max-age=0, must-revalidate'
+
+
+def _compressors():
+    if brotli is not None:
+        yield 'br', lambda data: brotli.compress(data, quality=11)
+    # mtime=0: одинаковые файлы дают одинаковый архив при каждой сборке.
+    yield 'gzip', lambda data: gzip.compress(data, 9, mtime=0)
+
+
+def compress_file(path):
+    """Пишет сжатые копии файла path, если они меньше оригинала."""
+    path = Path(path)
+    data = path.read_bytes()
+    written = []
+    for encoding, compress in _compressors():
+        compressed = compress(data)
+        # Почти несжимаемые файлы не стоят отдельной копии.
+        if len(compressed) >= len(data) * 0.95:
+            continue
+        target = path.with_name(path.name + ENCODING_SUFFIXES[encoding])
+        target.write_bytes(compressed)
+        written.append(target)
+    return written
+
+
+class CompressedManifestStorage(ManifestStaticFilesStorage):
+    """Хранилище с хэшами в именах и сжатыми копиями файлов."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            for path in compress_file(self.path(name)):
+                yield name, posixpath.join(
+                    posixpath.dirname(name), path.name
+                ), True
+
+
+def _manifest():
+    # Имена из манифеста; None, если статика собрана без хэшей.
+    return getattr(staticfiles_storage, 'hashed_files', None)
+
+
+@lru_cache(maxsize=None)
+def has_static(name):
+    """Есть ли файл статики name (проверка запоминается в процессе)."""
+    manifest = _manifest()
+    if manifest is not None:
+        return name in manifest
+    return finders.find(name) is not None
+
+
+def bootstrap_stylesheet():
+    """Ссылка на Bootstrap из статики сайта или, пока его нет, с CDN."""
+    if not has_static(BOOTSTRAP_CSS):
+        return bootstrap_css()
+    return mark_safe(render_link_tag(static(BOOTSTRAP_CSS)))
+
+
+@lru_cache(maxsize=1)
+def _fingerprinted_names():
+    return frozenset((_manifest() or {}).values())
+
+
+def _accepted_encodings(request):
+    accepted = set()
+    for item in request.headers.get('Accept-Encoding', '').split(','):
+        encoding, _, params = item.strip().partition(';')
+        if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00'):
+            accepted.add(encoding.strip().lower())
+    return accepted
+
+
+def _pick_variant(request, file_path):
+    accepted = _accepted_encodings(request)
+    for encoding, suffix in ENCODING_SUFFIXES.items():
+        variant = file_path.with_name(file_path.name + suffix)
+        if encoding in accepted and variant.is_file():
+            return encoding, variant
+    return None, file_path
+
+
+@require_safe
+def serve_static(request, path):
+    name = posixpath.normpath(path).lstrip('/')
+    file_path = Path(safe_join(settings.STATIC_ROOT, name))
+    if not file_path.is_file():
+        raise Http404
+    encoding, served = _pick_variant(request, file_path)
+    stat = served.stat()
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        content_type, _ = mimetypes.guess_type(name)
+        response = FileResponse(
+            served.open('rb'),
+            filename=file_path.name,
+            content_type=content_type or 'application/octet-stream'
+        )
+        if encoding is not None:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    response['Cache-Control'] = (
+        IMMUTABLE_CACHE_CONTROL if name in _fingerprinted_names()
+        else REVALIDATE_CACHE_CONTROL
+    )
+    return response
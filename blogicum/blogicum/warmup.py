@@ -0,0 +1,51 @@
+"""Прогрев воркера до приёма запросов.
+
+Компилирует все шаблоны проекта (при кэширующем загрузчике они так и
+остаются в памяти) и заполняет URL-резолвер, чтобы первые запросы после
+деплоя не платили за разбор шаблонов и импорт urls.
+"""
+from pathlib import Path
+
+from django.template import engines
+from django.urls import URLResolver, get_resolver
+
+
+def project_template_names(engine):
+    for directory in map(Path, engine.template_dirs):
+        for path in sorted(directory.rglob('*.html')):
+            yield path.relative_to(directory).as_posix()
+
+
+def compile_templates():
+    """Загружает все шаблоны из DIRS каждого движка. Возвращает их число."""
+    compiled = 0
+    for engine in engines.all():
+        for name in project_template_names(engine):
+            engine.get_template(name)
+            compiled += 1
+    return compiled
+
+
+def _compile_patterns(patterns):
+    count = 0
+    for pattern in patterns:
+        pattern.pattern.regex
+        if isinstance(pattern, URLResolver):
+            count += _compile_patterns(pattern.url_patterns)
+        else:
+            count += 1
+    return count
+
+
+def resolve_urls():
+    """Импортирует urlconf, компилирует регулярные выражения всех
+    маршрутов и строит таблицу reverse(). Возвращает число маршрутов.
+    """
+    resolver = get_resolver()
+    count = _compile_patterns(resolver.url_patterns)
+    resolver.reverse_dict
+    return count
+
+
+def warm_up():
+    return compile_templates(), resolve_urls()
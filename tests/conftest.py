@@ -41,6 +41,22 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def disable_image_workers():
+    # Image variants are made explicitly with blog.image_processing:
+    # a background pool would write to the test database concurrently.
+    with override_settings(BLOG_IMAGE_WORKERS=0):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -363,6 +379,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
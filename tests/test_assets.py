@@ -0,0 +1,147 @@
+import base64
+import gzip
+import hashlib
+import json
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from blog.management.commands import build_assets
+from blogicum import staticfiles
+from blogicum.staticfiles import (
+    BOOTSTRAP_CSS, IMMUTABLE_CACHE_CONTROL, bootstrap_stylesheet
+)
+
+pytestmark = [pytest.mark.django_db]
+
+CSS = b'body { background: url("../img/dot.png"); }\n' * 50
+BOOTSTRAP = b'.btn { color: red; }\n' * 100
+
+
+@pytest.fixture
+def static_dirs(settings, tmp_path):
+    source = tmp_path / 'static_dev'
+    (source / 'css').mkdir(parents=True)
+    (source / 'img').mkdir()
+    (source / 'css' / 'site.css').write_bytes(CSS)
+    (source / 'img' / 'dot.png').write_bytes(b'\x89PNG')
+    settings.STATICFILES_DIRS = [source]
+    settings.STATIC_ROOT = tmp_path / 'collected_static'
+    staticfiles.has_static.cache_clear()
+    staticfiles._fingerprinted_names.cache_clear()
+    yield source
+    staticfiles.has_static.cache_clear()
+    staticfiles._fingerprinted_names.cache_clear()
+
+
+@pytest.fixture
+def bootstrap_source(settings, monkeypatch):
+    integrity = 'sha384-' + base64.b64encode(
+        hashlib.sha384(BOOTSTRAP).digest()
+    ).decode()
+    settings.BOOTSTRAP5 = {
+        'css_url': {
+            'url': 'https://cdn.example.com/bootstrap.min.css',
+            'integrity': integrity,
+        },
+        'javascript_url': {'url': 'https://cdn.example.com/bootstrap.js'},
+    }
+    downloads = []
+
+    def urlopen(url):
+        downloads.append(url)
+        return BytesIO(BOOTSTRAP)
+
+    monkeypatch.setattr(build_assets, 'urlopen', urlopen)
+    return downloads
+
+
+@pytest.fixture
+def built(settings, static_dirs, bootstrap_source):
+    call_command('build_assets', verbosity=0)
+    settings.STATICFILES_STORAGE = (
+        'blogicum.staticfiles.CompressedManifestStorage'
+    )
+    manifest = json.loads(
+        (settings.STATIC_ROOT / 'staticfiles.json').read_text()
+    )
+    return manifest['paths']
+
+
+def test_build_vendors_bootstrap(static_dirs, bootstrap_source):
+    call_command('build_assets', verbosity=0)
+    assert (static_dirs / BOOTSTRAP_CSS).read_bytes() == BOOTSTRAP
+    call_command('build_assets', verbosity=0)
+    assert bootstrap_source.count(
+        'https://cdn.example.com/bootstrap.min.css'
+    ) == 1, (
+        'Убедитесь, что уже скачанный файл с верной контрольной суммой'
+        ' не скачивается повторно.'
+    )
+
+
+def test_build_rejects_tampered_bootstrap(
+    settings, static_dirs, bootstrap_source
+):
+    settings.BOOTSTRAP5['css_url']['integrity'] = 'sha384-AAAA'
+    with pytest.raises(CommandError):
+        call_command('build_assets', verbosity=0)
+    assert not (static_dirs / BOOTSTRAP_CSS).exists()
+
+
+def test_build_writes_hashed_and_compressed_files(settings, built):
+    hashed = built['css/site.css']
+    assert hashed.startswith('css/site.') and hashed != 'css/site.css'
+    root = settings.STATIC_ROOT
+    content = (root / hashed).read_bytes()
+    assert built['img/dot.png'].encode() in content, (
+        'Убедитесь, что ссылки внутри CSS указывают на файлы с хэшем.'
+    )
+    assert gzip.decompress((root / f'{hashed}.gz').read_bytes()) == content
+    assert BOOTSTRAP_CSS in built
+    assert not (root / f"{built['img/dot.png']}.gz").exists()
+
+
+def test_stylesheet_falls_back_to_cdn(static_dirs, bootstrap_source):
+    assert 'https://cdn.example.com/bootstrap.min.css' in (
+        bootstrap_stylesheet()
+    )
+
+
+def test_stylesheet_uses_fingerprinted_bootstrap(built):
+    assert f'href="/static/{built[BOOTSTRAP_CSS]}"' in (
+        bootstrap_stylesheet()
+    ), 'Убедитесь, что страницы подключают Bootstrap из статики сайта.'
+
+
+def test_serve_precompressed_variant(client, settings, built):
+    url = f"/static/{built['css/site.css']}"
+    response = client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['Content-Type'] == 'text/css'
+    assert 'Accept-Encoding' in response['Vary']
+    assert response['Cache-Control'] == IMMUTABLE_CACHE_CONTROL, (
+        'Убедитесь, что файлы с хэшем в имени отдаются с годовым'
+        ' неизменяемым кэшем.'
+    )
+    body = b''.join(response.streaming_content)
+    assert gzip.decompress(body) == (
+        settings.STATIC_ROOT / built['css/site.css']
+    ).read_bytes()
+    not_modified = client.get(
+        url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag']
+    )
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_serve_identity_when_not_accepted(client, built):
+    response = client.get(
+        f"/static/{built['css/site.css']}", HTTP_ACCEPT_ENCODING='gzip;q=0'
+    )
+    assert not response.has_header('Content-Encoding')
+    unhashed = client.get('/static/css/site.css')
+    assert unhashed['Cache-Control'] != IMMUTABLE_CACHE_CONTROL
@@ -0,0 +1,66 @@
+import pytest
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_card_rendered_from_fragment_cache(
+    user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get('/')
+    Post.objects.filter(pk=post.pk).update(title='Заголовок мимо сигналов')
+    assert 'Заголовок мимо сигналов' not in user_client.get(
+        '/').content.decode(), (
+        'Убедитесь, что карточка поста берётся из кэша фрагментов, пока'
+        ' пост не изменён.'
+    )
+    post.refresh_from_db()
+    post.save()
+    assert 'Заголовок мимо сигналов' in user_client.get('/').content.decode()
+
+
+@pytest.mark.parametrize('change', ['author', 'category', 'location'])
+def test_card_follows_related_changes(
+    change, user_client, user, post_with_published_location,
+    published_category, published_location,
+    django_capture_on_commit_callbacks
+):
+    user_client.get(f'/profile/{user.username}/')
+    if change == 'author':
+        user.username = 'renamed_author'
+        user.save()
+        expected = '@renamed_author'
+        url = '/profile/renamed_author/'
+    elif change == 'category':
+        with django_capture_on_commit_callbacks(execute=True):
+            published_category.title = 'Переименованная категория'
+            published_category.save()
+        expected = 'Переименованная категория'
+        url = f'/profile/{user.username}/'
+    else:
+        with django_capture_on_commit_callbacks(execute=True):
+            published_location.name = 'Переименованное место'
+            published_location.save()
+        expected = 'Переименованное место'
+        url = f'/profile/{user.username}/'
+    assert expected in user_client.get(url).content.decode(), (
+        'Убедитесь, что кэш карточки поста сбрасывается при изменении'
+        f' связанного объекта ({change}).'
+    )
+
+
+def test_comment_refreshes_card_not_updated_at(
+    user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get('/')
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Комментарий'})
+    assert 'Комментарии (1)' in user_client.get('/').content.decode()
+    updated_at = post.updated_at
+    post.refresh_from_db()
+    assert post.updated_at == updated_at, (
+        'Убедитесь, что updated_at поста меняется только при его правке,'
+        ' а не при новых комментариях.'
+    )
@@ -0,0 +1,52 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_updated_in_place(
+    user_client, post_with_published_location
+):
+    post = post_with_published_location
+    with CaptureQueriesContext(connection) as queries:
+        user_client.post(
+            f'/posts/{post.id}/comment/', {'text': 'Комментарий'}
+        )
+    updates = [
+        query['sql'] for query in queries.captured_queries
+        if query['sql'].startswith('UPDATE "blog_post"')
+    ]
+    assert len(updates) == 1 and '"title"' not in updates[0], (
+        'Убедитесь, что при добавлении комментария обновляется только'
+        ' счётчик комментариев, а не весь пост.'
+    )
+    post.refresh_from_db()
+    assert post.comment_count == 1
+
+    comment = Comment.objects.get(post=post)
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    post.refresh_from_db()
+    assert post.comment_count == 0
+
+
+def test_comment_count_does_not_clobber_post_edit(
+    user_client, post_with_published_location
+):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(title='Правка автора')
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Комментарий'})
+    post.refresh_from_db()
+    assert post.title == 'Правка автора'
+
+
+def test_reconcile_comment_counts(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comment', post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=40000)
+    call_command('reconcile_comment_counts', chunk_size=1)
+    post.refresh_from_db()
+    assert post.comment_count == 3
@@ -0,0 +1,53 @@
+import re
+
+import pytest
+
+from blog.views import COMMENTS_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+MORE_LINK = re.compile(r'href="([^"]+/comments/\?after=[^"]+)"')
+
+
+@pytest.fixture
+def many_comments(mixer, post_with_published_location):
+    return mixer.cycle(COMMENTS_PER_PAGE + 7).blend(
+        'blog.Comment', post=post_with_published_location
+    )
+
+
+def comment_ids(content):
+    return [int(i) for i in re.findall(r'name="comment_(\d+)"', content)]
+
+
+def test_detail_renders_first_comments_and_more_link(
+    client, post_with_published_location, many_comments
+):
+    content = client.get(
+        f'/posts/{post_with_published_location.id}/').content.decode()
+    expected = [comment.id for comment in many_comments]
+    assert comment_ids(content) == expected[:COMMENTS_PER_PAGE], (
+        'Убедитесь, что на странице поста сразу выводится только первая'
+        ' порция комментариев.'
+    )
+    more = MORE_LINK.search(content)
+    assert more, 'Убедитесь, что есть ссылка «Показать ещё комментарии».'
+
+    fragment = client.get(more.group(1).replace('&amp;', '&'))
+    assert fragment.status_code == 200
+    fragment_content = fragment.content.decode()
+    assert comment_ids(fragment_content) == expected[COMMENTS_PER_PAGE:]
+    assert not MORE_LINK.search(fragment_content)
+    assert '<html' not in fragment_content
+
+
+def test_comment_fragment_respects_visibility(
+    another_user_client, user_client, post_with_published_location,
+    many_comments
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    url = f'/posts/{post.id}/comments/'
+    assert another_user_client.get(url).status_code == 404
+    assert user_client.get(url).status_code == 200
@@ -0,0 +1,121 @@
+from http import HTTPStatus
+
+import pytest
+from django.test.client import Client
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def page_urls(user, published_category, post_with_published_location):
+    return (
+        '/',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+        f'/posts/{post_with_published_location.id}/',
+    )
+
+
+def test_matching_etag_gets_not_modified(client, user_client, page_urls):
+    for page_client in (client, user_client):
+        for url in page_urls:
+            # Первый ответ может выставить CSRF-cookie, она входит в ETag.
+            page_client.get(url)
+            response = page_client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert response.has_header('ETag')
+            assert 'Cookie' in response['Vary']
+            not_modified = page_client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+            assert not_modified.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Убедитесь, что страница `{url}` с неизменившимся ETag'
+                ' отдаётся ответом 304.'
+            )
+            assert not not_modified.templates
+            assert not_modified['ETag'] == response['ETag']
+
+
+def test_if_modified_since(client, page_urls):
+    for url in page_urls:
+        response = client.get(url)
+        not_modified = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_no_last_modified_for_users(client, user_client, page_urls):
+    for url in page_urls:
+        last_modified = client.get(url)['Last-Modified']
+        response = user_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Убедитесь, что страница `{url}` для пользователя не отдаётся'
+            ' ответом 304 только по If-Modified-Since.'
+        )
+        assert not response.has_header('Last-Modified')
+
+
+def test_etag_depends_on_viewer(client, user_client, another_user, page_urls):
+    another_client = Client()
+    another_client.force_login(another_user)
+    for url in page_urls:
+        etags = {
+            page_client.get(url)['ETag']
+            for page_client in (client, user_client, another_client)
+        }
+        assert len(etags) == 3, (
+            f'Убедитесь, что ETag страницы `{url}` различается для гостя'
+            ' и разных пользователей.'
+        )
+
+
+def test_post_change_changes_etag(
+    client, page_urls, post_with_published_location
+):
+    etags = {url: client.get(url)['ETag'] for url in page_urls}
+    post_with_published_location.title = 'Новый заголовок публикации'
+    post_with_published_location.save()
+    for url in page_urls:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == HTTPStatus.OK
+        assert response['ETag'] != etags[url]
+
+
+def test_comment_activity_changes_post_etag(
+    mixer, user, user_client, post_with_published_location
+):
+    comment = mixer.blend(
+        'blog.Comment', post=post_with_published_location, author=user
+    )
+    url = f'/posts/{post_with_published_location.id}/'
+    etag = user_client.get(url)['ETag']
+    user_client.post(
+        f'/posts/{post_with_published_location.id}'
+        f'/edit_comment/{comment.id}/',
+        {'text': 'Исправленный комментарий'}
+    )
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что правка комментария меняет ETag страницы поста.'
+    )
+    assert 'Исправленный комментарий' in response.content.decode()
+
+
+def test_etag_issued_before_commit_is_not_reused(
+    client, page_urls, post_with_published_location,
+    django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks() as callbacks:
+        post_with_published_location.title = 'Новый заголовок публикации'
+        post_with_published_location.save()
+        # Запрос между сигналом и коммитом видит ещё старые данные.
+        etags = {url: client.get(url)['ETag'] for url in page_urls}
+    for callback in callbacks:
+        callback()
+    for url in page_urls:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == HTTPStatus.OK, (
+            f'Убедитесь, что ETag страницы `{url}`, выданный до коммита'
+            ' изменений, после него не подтверждается.'
+        )
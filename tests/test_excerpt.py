@@ -0,0 +1,38 @@
+import pytest
+from django.db import connection
+from django.template.defaultfilters import truncatewords
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_excerpt_matches_truncatewords(mixer, published_category):
+    text = ' '.join(f'слово{i}' for i in range(50))
+    post = mixer.blend('blog.Post', text=text, category=published_category)
+    assert post.excerpt == truncatewords(text, 10)
+    post.text = 'Короткий текст'
+    post.save(update_fields=['text'])
+    post.refresh_from_db()
+    assert post.excerpt == 'Короткий текст'
+
+
+def test_feeds_do_not_load_post_text(
+    client, user_client, user, published_category,
+    many_posts_with_published_locations
+):
+    urls = (
+        '/',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+    )
+    for http_client in (client, user_client):
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                response = http_client.get(url)
+            for query in queries.captured_queries:
+                assert '"blog_post"."text"' not in query['sql'], (
+                    f'Убедитесь, что лента `{url}` не загружает полный'
+                    ' текст публикаций.'
+                )
+            first_post = response.context['page_obj'][0]
+            assert first_post.excerpt in response.content.decode()
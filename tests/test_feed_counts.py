@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.checks import check_shared_cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return [
+        query['sql'] for query in queries.captured_queries
+        if 'COUNT(' in query['sql'].upper()
+    ]
+
+
+def paginator_count(client, url):
+    return client.get(url).context['page_obj'].paginator.count
+
+
+@pytest.fixture
+def feed_urls(user, published_category, many_posts_with_published_locations):
+    return (
+        '/',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+    )
+
+
+def test_count_is_cached(client, user_client, feed_urls):
+    for http_client, url in (
+        *((client, url) for url in feed_urls),
+        (user_client, feed_urls[-1]),
+    ):
+        assert count_queries(http_client, url)
+        assert not count_queries(http_client, url), (
+            f'Убедитесь, что число публикаций на странице `{url}`'
+            ' берётся из кэша при повторном запросе.'
+        )
+
+
+def test_count_invalidated_on_post_changes(
+    client, mixer, user, published_category, feed_urls
+):
+    before = [paginator_count(client, url) for url in feed_urls]
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category
+    )
+    assert [paginator_count(client, url) for url in feed_urls] == [
+        n + 1 for n in before
+    ]
+    post.is_published = False
+    post.save()
+    assert [paginator_count(client, url) for url in feed_urls] == before
+
+
+def test_count_invalidated_on_category_changes(
+    client, published_category, feed_urls
+):
+    index_url = feed_urls[0]
+    assert paginator_count(client, index_url)
+    published_category.is_published = False
+    published_category.save()
+    assert paginator_count(client, index_url) == 0
+
+
+def test_count_follows_scheduled_post(
+    client, mixer, user, published_category, monkeypatch
+):
+    pub_date = timezone.now() + timedelta(seconds=30)
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=pub_date,
+    )
+    before = paginator_count(client, '/')
+    monkeypatch.setattr(
+        timezone, 'now', lambda: pub_date + timedelta(seconds=1)
+    )
+    assert paginator_count(client, '/') == before + 1, (
+        'Убедитесь, что с наступлением даты отложенной публикации пост'
+        ' попадает в ленту и кэш числа публикаций сбрасывается.'
+    )
+
+
+def test_process_local_cache_warning(settings):
+    assert [error.id for error in check_shared_cache(None)] == ['blog.W001']
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'blog_cache',
+    }}
+    assert check_shared_cache(None) == []
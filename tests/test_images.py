@@ -0,0 +1,224 @@
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from io import BytesIO, StringIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image
+
+from blog import image_processing
+from blog.image_processing import pending_posts, process_images
+from blog.images import IMAGE_SIZES
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_image(width, height, mode='RGB', image_format='JPEG'):
+    img_io = BytesIO()
+    Image.new(mode, (width, height)).save(img_io, format=image_format)
+    extension = image_format.lower().replace('jpeg', 'jpg')
+    return ImageFile(img_io, name=f'temp_image.{extension}')
+
+
+def process(post):
+    assert process_images(Post.objects.filter(pk=post.pk), jobs=1) == (1, [])
+    post.refresh_from_db()
+    return post
+
+
+@pytest.fixture
+def pending_post(mixer, user, published_location, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, location=published_location,
+        category=published_category, image=make_image(1600, 900),
+    )
+
+
+@pytest.fixture
+def wide_post(pending_post):
+    return process(pending_post)
+
+
+def test_upload_stores_dimensions_only(pending_post):
+    assert pending_post.image_meta == {'width': 1600, 'height': 900}, (
+        'Убедитесь, что при сохранении поста записываются размеры'
+        ' изображения, а копии не делаются во время запроса.'
+    )
+    assert list(pending_posts()) == [pending_post]
+
+
+def test_variants_generated(wide_post):
+    assert (wide_post.image_width, wide_post.image_height) == (1600, 900)
+    assert not pending_posts().exists()
+    variants = wide_post.image_variants
+    assert {
+        name: (variant['width'], variant['height'])
+        for name, variant in variants.items()
+    } == {'card': (640, 360), 'detail': (960, 540), 'retina': (1280, 720)}, (
+        'Убедитесь, что при загрузке изображения сохраняются его копии'
+        ' шириной 640, 960 и 1280 пикселей с исходными пропорциями.'
+    )
+    for variant in variants.values():
+        assert variant['path'].endswith('.jpg')
+        assert variant['webp'].endswith('.webp')
+        assert default_storage.exists(variant['path'])
+        with default_storage.open(variant['webp']) as webp:
+            assert Image.open(webp).format == 'WEBP'
+
+
+def test_small_image_not_upscaled(mixer, user):
+    post = process(mixer.blend(
+        'blog.Post', author=user,
+        image=make_image(300, 200, 'RGBA', 'PNG'),
+    ))
+    assert list(post.image_variants) == ['card']
+    card = post.image_variants['card']
+    assert (card['width'], card['height']) == (300, 200)
+    assert card['path'].endswith('.png'), (
+        'Убедитесь, что копии изображения с прозрачностью сохраняются в PNG.'
+    )
+
+
+def test_variants_kept_when_image_unchanged(wide_post):
+    variants = wide_post.image_variants
+    wide_post.title = 'Новый заголовок'
+    wide_post.save()
+    wide_post.refresh_from_db()
+    wide_post.save()
+    assert wide_post.image_variants == variants
+    wide_post.image = make_image(800, 400)
+    wide_post.save()
+    assert not wide_post.image_variants
+    process(wide_post)
+    assert wide_post.image_variants['detail']['width'] == 800
+    assert 'retina' not in wide_post.image_variants
+    assert wide_post.image_variants['card']['path'] != variants['card']['path']
+
+
+def test_variants_copied_to_timeline(wide_post):
+    entry = wide_post.timeline_entry
+    entry.refresh_from_db()
+    assert entry.image_meta == wide_post.image_meta
+    assert entry.image_width == 1600
+
+
+@pytest.mark.parametrize('url_name', ['index', 'detail'])
+def test_responsive_image_rendered(url_name, client, wide_post):
+    url = {'index': '/', 'detail': f'/posts/{wide_post.id}/'}[url_name]
+    soup = BeautifulSoup(client.get(url).content.decode(), 'html.parser')
+    pictures = soup.find_all('picture')
+    assert len(pictures) == 1
+    img = pictures[0].find('img')
+    card = wide_post.image_variants['card']
+    assert img['src'] == default_storage.url(card['path'])
+    assert img['sizes'] == IMAGE_SIZES
+    assert img['srcset'].count('w,') == 2
+    assert (img['width'], img['height']) == ('1600', '900'), (
+        'Убедитесь, что у изображения поста указаны width и height,'
+        ' чтобы вёрстка не сдвигалась при загрузке.'
+    )
+    assert img['loading'] == ('lazy' if url_name == 'index' else 'eager')
+    source = pictures[0].find('source')
+    assert source['type'] == 'image/webp'
+    assert default_storage.url(card['webp']) in source['srcset']
+    assert img.find_parent('a')['href'] == wide_post.image.url
+
+
+def test_pending_image_falls_back_to_original(client, pending_post):
+    detail = client.get(f'/posts/{pending_post.id}/').content.decode()
+    img = BeautifulSoup(detail, 'html.parser').find('picture').find('img')
+    assert img['src'] == pending_post.image.url, (
+        'Убедитесь, что пока копии изображения не готовы, страница'
+        ' показывает оригинал.'
+    )
+    assert not img.has_attr('srcset')
+    assert (img['width'], img['height']) == ('1600', '900')
+
+
+def test_stored_variants_invalidate_cached_pages(client, pending_post):
+    card_url = pending_post.image.url
+    assert card_url in client.get('/').content.decode()
+    process(pending_post)
+    content = client.get('/').content.decode()
+    assert default_storage.url(
+        pending_post.image_variants['card']['path']
+    ) in content, (
+        'Убедитесь, что готовые копии изображения сбрасывают кэш карточки'
+        ' и страниц ленты.'
+    )
+
+
+def test_variants_for_replaced_image_discarded(pending_post):
+    name = pending_post.image.name
+    pending_post.image = make_image(800, 400)
+    pending_post.save()
+    assert not image_processing.store_variants(
+        pending_post.pk, name, {'width': 1, 'height': 1, 'variants': {}}
+    )
+    pending_post.refresh_from_db()
+    assert pending_post.image_meta == {'width': 800, 'height': 400}
+
+
+def test_image_queued_after_commit(
+    mixer, user, settings, monkeypatch, django_capture_on_commit_callbacks
+):
+    settings.BLOG_IMAGE_WORKERS = 2
+    submitted = []
+    monkeypatch.setattr(
+        image_processing, '_submit',
+        lambda post_id, name: submitted.append((post_id, name))
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        post = mixer.blend('blog.Post', author=user, image=make_image(10, 10))
+    assert submitted == [(post.pk, post.image.name)], (
+        'Убедитесь, что новое изображение поста отправляется на обработку'
+        ' после коммита транзакции.'
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        post.title = 'Новый заголовок'
+        post.save()
+    assert len(submitted) == 1
+
+
+def test_broken_pool_replaced(settings, monkeypatch, pending_post):
+    settings.BLOG_IMAGE_WORKERS = 1
+    broken = ProcessPoolExecutor(max_workers=1)
+    broken.submit(os._exit, 1).exception()
+    monkeypatch.setattr(image_processing, '_executor', broken)
+    stored = []
+    monkeypatch.setattr(
+        image_processing, '_store_result',
+        lambda post_id, name, future: stored.append(future.result())
+    )
+    image_processing._submit(pending_post.pk, pending_post.image.name)
+    executor = image_processing._executor
+    assert executor is not broken, (
+        'Убедитесь, что сломанный пул обработки изображений создаётся'
+        ' заново.'
+    )
+    executor.shutdown()
+    assert set(stored[0]['variants']) == {'card', 'detail', 'retina'}
+
+
+def test_failed_variants_logged(caplog, pending_post):
+    future = Future()
+    future.set_exception(OSError('нет файла'))
+    image_processing._store_result(
+        pending_post.pk, pending_post.image.name, future
+    )
+    assert 'Не удалось сделать копии' in caplog.text
+    assert list(pending_posts()) == [pending_post]
+
+
+def test_process_images_command(pending_post):
+    out = StringIO()
+    call_command('process_images', '--jobs', '2', stdout=out)
+    assert out.getvalue() == 'Обработано изображений: 1.\n'
+    pending_post.refresh_from_db()
+    assert set(pending_post.image_variants) == {'card', 'detail', 'retina'}
+    call_command('process_images', '--all', stdout=out)
+    assert out.getvalue().endswith('Обработано изображений: 1.\n')
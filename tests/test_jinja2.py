@@ -0,0 +1,78 @@
+import pytest
+from bs4 import BeautifulSoup
+
+pytest.importorskip('jinja2')
+
+pytestmark = [pytest.mark.django_db]
+
+
+def page_text(response):
+    if response.streaming:
+        content = b''.join(response.streaming_content)
+    else:
+        content = response.content
+    soup = BeautifulSoup(content.decode(), features='html.parser')
+    links = sorted(a['href'] for a in soup.find_all('a', href=True))
+    return ' '.join(soup.get_text().split()), links
+
+
+@pytest.fixture
+def use_jinja2(settings):
+    def switch():
+        settings.TEMPLATES = [
+            settings.BLOG_JINJA2_TEMPLATES, *settings.TEMPLATES
+        ]
+    return switch
+
+
+@pytest.fixture
+def blog_urls(mixer, user, published_category, post_with_published_location,
+              many_posts_with_published_locations):
+    post_id = post_with_published_location.id
+    comment = mixer.blend(
+        'blog.Comment', post=post_with_published_location, author=user
+    )
+    return (
+        '/',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+        f'/posts/{post_id}/',
+        f'/posts/{post_id}/edit/',
+        f'/posts/{post_id}/delete/',
+        f'/posts/{post_id}/edit_comment/{comment.id}/',
+        f'/posts/{post_id}/delete_comment/{comment.id}/',
+        '/posts/create/',
+        '/edit_profile/',
+    )
+
+
+def test_jinja2_pages_match_django(user_client, blog_urls, use_jinja2):
+    expected = [page_text(user_client.get(url)) for url in blog_urls]
+    use_jinja2()
+    for url, django_page in zip(blog_urls, expected):
+        response = user_client.get(url)
+        assert response.status_code == 200
+        # Теги django_bootstrap5 рендерят свои шаблоны Django.
+        django_blog_templates = [
+            template.name for template in response.templates
+            if template.name.startswith(('blog/', 'includes/', 'base.html'))
+        ]
+        assert not django_blog_templates, (
+            f'Убедитесь, что страница `{url}` рендерится через Jinja2.'
+        )
+        assert page_text(response) == django_page, (
+            f'Убедитесь, что страница `{url}` в Jinja2 совпадает'
+            ' с версией для шаблонов Django.'
+        )
+
+
+def test_jinja2_streamed_feed(settings, client, blog_urls, use_jinja2):
+    expected = page_text(client.get('/'))
+    use_jinja2()
+    settings.BLOG_STREAM_FEEDS = True
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache'
+        }
+    }
+    assert page_text(client.get('/')) == expected
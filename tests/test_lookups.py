@@ -0,0 +1,183 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.forms import CreatePostForm
+from blog.lookups import current
+from blog.models import Category, TimelineEntry
+
+pytestmark = [pytest.mark.django_db]
+
+LOOKUP_TABLES = ('"blog_category"', '"blog_location"')
+
+
+def lookup_queries(func):
+    with CaptureQueriesContext(connection) as queries:
+        result = func()
+    return result, [
+        query['sql'] for query in queries.captured_queries
+        if any(table in query['sql'] for table in LOOKUP_TABLES)
+    ]
+
+
+def test_lookups_loaded_once(published_category, published_location):
+    current()
+    lookups, queries = lookup_queries(current)
+    assert not queries, (
+        'Убедитесь, что категории и места читаются из памяти процесса,'
+        ' пока они не изменились.'
+    )
+    assert lookups.categories[published_category.pk] == published_category
+    assert lookups.locations[published_location.pk] == published_location
+
+
+def test_lookups_follow_changes(
+    published_category, published_location,
+    django_capture_on_commit_callbacks
+):
+    version = current().version
+    with django_capture_on_commit_callbacks() as callbacks:
+        published_category.slug = 'renamed'
+        published_category.save()
+    assert current().version == version, (
+        'Убедитесь, что версия справочника меняется только после коммита.'
+    )
+    for callback in callbacks:
+        callback()
+    assert current().version != version
+    assert current().published_category('renamed') == published_category
+    with django_capture_on_commit_callbacks(execute=True):
+        published_location.delete()
+    assert published_location.pk not in current().locations
+
+
+def test_lookups_expire(settings, published_category, mixer):
+    lookups = current()
+    settings.BLOG_LOOKUPS_MAX_AGE = 0
+    category = mixer.blend('blog.Category', is_published=True)
+    # Изменение из другого процесса: версия в кэше не сдвинулась.
+    assert current() is not lookups
+    assert current().published_category(category.slug) == category
+
+
+def test_post_form_checks_stale_choice(published_category, mixer):
+    current()
+    stale = mixer.blend('blog.Location', is_published=True)
+    stale_pk = stale.pk
+    # Место удалено, а справочник процесса об этом ещё не знает.
+    type(stale).objects.filter(pk=stale_pk).delete()
+    current().locations[stale_pk] = stale
+    form = CreatePostForm(data={
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'pub_date': '2024-01-01',
+        'category': published_category.pk,
+        'location': stale_pk,
+    })
+    assert not form.is_valid(), (
+        'Убедитесь, что устаревший выбор из справочника не проходит'
+        ' проверку формы.'
+    )
+    assert 'location' in form.errors
+
+
+@pytest.mark.parametrize('url_name', ['category', 'detail', 'profile'])
+def test_pages_do_not_query_lookups(
+    url_name, user_client, user, published_category,
+    post_with_published_location
+):
+    url = {
+        'category': f'/category/{published_category.slug}/',
+        'detail': f'/posts/{post_with_published_location.id}/',
+        'profile': f'/profile/{user.username}/',
+    }[url_name]
+    user_client.get(url)
+    response, queries = lookup_queries(lambda: user_client.get(url))
+    assert response.status_code == HTTPStatus.OK
+    assert published_category.title in response.content.decode()
+    assert post_with_published_location.location.name in (
+        response.content.decode()
+    )
+    assert not queries, (
+        f'Убедитесь, что страница `{url}` берёт категорию и место поста'
+        ' из справочника в памяти, а не из базы.'
+    )
+
+
+def test_unpublished_category_page_not_found(client, mixer):
+    category = mixer.blend('blog.Category', is_published=False)
+    response = client.get(f'/category/{category.slug}/')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_streamed_profile_attaches_lookups(
+    settings, user_client, user, post_with_published_location
+):
+    settings.BLOG_STREAM_FEEDS = True
+    url = f'/profile/{user.username}/'
+    b''.join(user_client.get(url).streaming_content)
+    response, queries = lookup_queries(
+        lambda: b''.join(user_client.get(url).streaming_content)
+    )
+    assert post_with_published_location.category.title.encode() in response
+    assert not queries
+
+
+def test_post_form_saves_current_category(user, published_category):
+    current()
+    # Категорию скрыли мимо сигналов: справочник процесса устарел.
+    Category.objects.filter(pk=published_category.pk).update(
+        is_published=False
+    )
+    assert current().categories[published_category.pk].is_published
+    form = CreatePostForm(data={
+        'is_published': 'on',
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'pub_date': '2024-01-01',
+        'category': published_category.pk,
+    })
+    assert form.is_valid(), form.errors
+    form.instance.author = user
+    post = form.save()
+    assert not post.is_visible, (
+        'Убедитесь, что видимость поста вычисляется по категории из базы,'
+        ' а не из справочника процесса.'
+    )
+    assert not TimelineEntry.objects.filter(pk=post.pk).exists()
+
+
+def test_post_form_uses_lookups(
+    published_category, another_category, published_location
+):
+    current()
+    form, queries = lookup_queries(lambda: CreatePostForm(data={
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'pub_date': '2024-01-01',
+        'category': another_category.pk,
+        'location': published_location.pk,
+    }))
+    rendered, render_queries = lookup_queries(CreatePostForm().as_p)
+    # Проверка ForeignKey моделью при is_valid() по-прежнему идёт в базу.
+    assert form.is_valid(), form.errors
+    assert not queries + render_queries, (
+        'Убедитесь, что форма поста берёт варианты категорий и мест'
+        ' из справочника в памяти.'
+    )
+    assert form.cleaned_data['category'] == another_category
+    assert form.cleaned_data['location'] == published_location
+    assert published_category.title in rendered
+
+
+def test_post_form_rejects_unknown_category(published_category):
+    form = CreatePostForm(data={
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'pub_date': '2024-01-01',
+        'category': published_category.pk + 100,
+    })
+    assert not form.is_valid()
+    assert 'category' in form.errors
@@ -0,0 +1,126 @@
+from http import HTTPStatus
+
+import pytest
+from django.utils.http import http_date
+
+from blog.media import IMMUTABLE_CACHE_CONTROL
+from blog.storage import post_images_storage
+from test_images import make_image
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post(mixer, user):
+    return mixer.blend('blog.Post', author=user, image=make_image(50, 30))
+
+
+@pytest.fixture
+def image_content(post):
+    with post.image.open('rb') as image_file:
+        return image_file.read()
+
+
+def content(response):
+    return b''.join(response.streaming_content)
+
+
+def test_media_served_with_validators(client, post, image_content):
+    response = client.get(post.image.url)
+    assert response.status_code == HTTPStatus.OK
+    assert content(response) == image_content
+    assert response['Content-Type'] == 'image/jpeg'
+    assert response['Accept-Ranges'] == 'bytes'
+    assert response['Last-Modified'] == http_date(
+        int(post_images_storage.get_modified_time(post.image.name)
+            .timestamp())
+    )
+    assert response['Cache-Control'] == IMMUTABLE_CACHE_CONTROL, (
+        'Убедитесь, что файлы с именем из хэша содержимого отдаются'
+        ' с долгим неизменяемым кэшем.'
+    )
+    not_modified = client.get(
+        post.image.url, HTTP_IF_NONE_MATCH=response['ETag']
+    )
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert not_modified['ETag'] == response['ETag']
+    assert client.get(
+        post.image.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    ).status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.parametrize('header,expected', [
+    ('bytes=0-9', slice(0, 10)),
+    ('bytes=10-', slice(10, None)),
+    ('bytes=-5', slice(-5, None)),
+])
+def test_media_byte_ranges(client, post, image_content, header, expected):
+    response = client.get(post.image.url, HTTP_RANGE=header)
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert response['Content-Type'] == 'image/jpeg', (
+        'Убедитесь, что часть файла отдаётся с типом содержимого файла.'
+    )
+    body = content(response)
+    assert body == image_content[expected]
+    assert int(response['Content-Length']) == len(body)
+    size = len(image_content)
+    start = image_content.index(body)
+    assert response['Content-Range'] == (
+        f'bytes {start}-{start + len(body) - 1}/{size}'
+    )
+
+
+def test_media_unsatisfiable_range(client, post, image_content):
+    response = client.get(
+        post.image.url, HTTP_RANGE=f'bytes={len(image_content)}-'
+    )
+    assert response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+    assert response['Content-Range'] == f'bytes */{len(image_content)}'
+
+
+def test_media_stale_if_range_returns_whole_file(
+    client, post, image_content
+):
+    response = client.get(
+        post.image.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"'
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert content(response) == image_content
+
+
+@pytest.mark.parametrize('mode,header', [
+    ('x-accel-redirect', 'X-Accel-Redirect'),
+    ('x-sendfile', 'X-Sendfile'),
+])
+def test_media_handed_off_to_proxy(client, settings, post, mode, header):
+    settings.BLOG_MEDIA_SENDFILE = mode
+    response = client.get(post.image.url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.content == b'', (
+        'Убедитесь, что при передаче файла прокси Django не отдаёт'
+        ' его содержимое.'
+    )
+    expected = {
+        'x-accel-redirect': (
+            settings.BLOG_MEDIA_ACCEL_PREFIX + post.image.name
+        ),
+        'x-sendfile': post_images_storage.path(post.image.name),
+    }[mode]
+    assert response[header] == expected
+    assert response['Content-Type'] == 'image/jpeg'
+    assert response['ETag']
+
+
+@pytest.mark.parametrize('path,status', [
+    ('/media/posts_images/missing.jpg', HTTPStatus.NOT_FOUND),
+    ('/media/posts_images/', HTTPStatus.NOT_FOUND),
+    ('/media/../blogicum/settings.py', HTTPStatus.BAD_REQUEST),
+])
+def test_media_missing_files(client, path, status):
+    assert client.get(path).status_code == status
+
+
+def test_media_read_only(client, post):
+    assert client.post(post.image.url).status_code == (
+        HTTPStatus.METHOD_NOT_ALLOWED
+    )
@@ -0,0 +1,166 @@
+import hashlib
+import os
+import time
+from functools import partial
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.image_processing import (
+    image_references, process_images, release_images
+)
+from blog.images import variant_paths
+from blog.models import Post
+from blog.storage import post_images_storage
+from test_images import make_image
+
+pytestmark = [pytest.mark.django_db]
+
+
+def image_bytes(image_file):
+    image_file.seek(0)
+    return image_file.read()
+
+
+def test_upload_stored_under_digest(mixer, user):
+    image_file = make_image(40, 30)
+    digest = hashlib.sha256(image_bytes(image_file)).hexdigest()
+    post = mixer.blend('blog.Post', author=user, image=image_file)
+    assert post.image.name == f'posts_images/{digest[:2]}/{digest}.jpg', (
+        'Убедитесь, что изображение поста сохраняется под именем из'
+        ' SHA-256 его содержимого.'
+    )
+    with post.image.open('rb') as stored:
+        assert stored.read() == image_bytes(image_file)
+
+
+def test_same_upload_stored_once(mixer, user, another_user):
+    first = mixer.blend('blog.Post', author=user, image=make_image(41, 30))
+    second = mixer.blend(
+        'blog.Post', author=another_user, image=make_image(41, 30)
+    )
+    assert first.image.name == second.image.name
+    assert image_references(first.image.name) == 2
+    path = post_images_storage.path(first.image.name)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    stored = os.listdir(os.path.dirname(path))
+    assert [name for name in stored if name.startswith(stem)] == [
+        os.path.basename(path)
+    ]
+    assert not [name for name in stored if name.endswith('.part')]
+
+
+def test_shared_upload_reuses_variants(mixer, user, another_user):
+    first = mixer.blend('blog.Post', author=user, image=make_image(42, 30))
+    process_images(Post.objects.filter(pk=first.pk), jobs=1)
+    first.refresh_from_db()
+    second = mixer.blend(
+        'blog.Post', author=another_user, image=make_image(42, 30)
+    )
+    assert second.image_meta == first.image_meta, (
+        'Убедитесь, что для уже загруженного файла копии изображения'
+        ' не делаются заново.'
+    )
+    assert not second._image_changed
+
+
+def test_replaced_image_released_when_unreferenced(
+    settings, mixer, user, another_user, django_capture_on_commit_callbacks
+):
+    settings.BLOG_IMAGE_RELEASE_GRACE = 0
+    first = mixer.blend('blog.Post', author=user, image=make_image(43, 30))
+    second = mixer.blend(
+        'blog.Post', author=another_user, image=make_image(43, 30)
+    )
+    process_images(Post.objects.filter(pk=first.pk), jobs=1)
+    name = first.image.name
+    with django_capture_on_commit_callbacks(execute=True):
+        first.image = make_image(44, 30)
+        first.save()
+    assert post_images_storage.exists(name), (
+        'Убедитесь, что файл изображения не удаляется, пока на него'
+        ' ссылается другой пост.'
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        second.image = None
+        second.save()
+    assert not post_images_storage.exists(name), (
+        'Убедитесь, что файл изображения удаляется, когда на него не'
+        ' остаётся ссылок.'
+    )
+    assert not any(
+        post_images_storage.exists(path) for path in variant_paths(name)
+    )
+    assert post_images_storage.exists(first.image.name)
+
+
+def test_deleted_post_releases_image(
+    settings, mixer, user, django_capture_on_commit_callbacks
+):
+    settings.BLOG_IMAGE_RELEASE_GRACE = 0
+    post = mixer.blend('blog.Post', author=user, image=make_image(45, 30))
+    process_images(Post.objects.filter(pk=post.pk), jobs=1)
+    post.refresh_from_db()
+    paths = [post.image.name, *(
+        variant['webp'] for variant in post.image_variants.values()
+    )]
+    assert all(post_images_storage.exists(path) for path in paths)
+    with django_capture_on_commit_callbacks(execute=True):
+        post.delete()
+    assert not any(post_images_storage.exists(path) for path in paths)
+
+
+def age(name, seconds):
+    past = time.time() - seconds
+    os.utime(post_images_storage.path(name), (past, past))
+
+
+def test_reused_image_not_released(settings, mixer, user, another_user):
+    settings.BLOG_IMAGE_RELEASE_GRACE = 60
+    first = mixer.blend('blog.Post', author=user, image=make_image(46, 30))
+    name = first.image.name
+    first.delete()
+    age(name, 120)
+    # Второй пост загрузил тот же файл, но ещё не закоммичен: ссылок на
+    # файл в базе нет, а освобождение идёт после коммита первого поста.
+    upload_again = partial(
+        post_images_storage.save, 'posts_images/again.jpg', make_image(46, 30)
+    )
+    assert upload_again() == name
+    assert release_images([name]) == 0
+    assert post_images_storage.exists(name), (
+        'Убедитесь, что файл, только что загруженный повторно, не'
+        ' удаляется, пока пост с ним может быть не закоммичен.'
+    )
+    age(name, 120)
+    assert release_images([name]) == 1
+    assert upload_again() == name
+    assert post_images_storage.exists(name)
+
+
+def test_sweep_images(settings, mixer, user):
+    settings.BLOG_IMAGE_RELEASE_GRACE = 60
+    kept = mixer.blend('blog.Post', author=user, image=make_image(47, 30))
+    orphan = post_images_storage.save(
+        'posts_images/orphan.jpg', make_image(48, 30)
+    )
+    fresh = post_images_storage.save(
+        'posts_images/fresh.jpg', make_image(49, 30)
+    )
+    part = post_images_storage.path('posts_images/upload.part')
+    open(part, 'wb').close()
+    for name in (kept.image.name, orphan, 'posts_images/upload.part'):
+        age(name, 120)
+    out = StringIO()
+    call_command('sweep_images', stdout=out)
+    assert not post_images_storage.exists(orphan), (
+        'Убедитесь, что sweep_images удаляет давние файлы без ссылок.'
+    )
+    assert not os.path.exists(part)
+    assert post_images_storage.exists(kept.image.name)
+    assert post_images_storage.exists(fresh)
+    assert 'временных файлов: 1' in out.getvalue()
+    # Состаренные файлы не удалит общая очистка по времени изменения.
+    post_images_storage.delete(fresh)
+    post_images_storage.delete(kept.image.name)
@@ -0,0 +1,134 @@
+from datetime import timedelta
+
+import pytest
+from django.test.client import Client
+from django.utils import timezone
+
+from blog.models import Post, TimelineEntry
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def page_urls(user, published_category, post_with_published_location):
+    return (
+        '/',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+        f'/posts/{post_with_published_location.id}/',
+    )
+
+
+def test_anonymous_hit_skips_orm_and_templates(
+    client, page_urls, django_assert_num_queries
+):
+    for url in page_urls:
+        first = client.get(url)
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second.content == first.content
+        assert not second.templates, (
+            f'Убедитесь, что закэшированная страница `{url}` отдаётся'
+            ' без рендеринга шаблонов.'
+        )
+
+
+def test_authenticated_pages_not_cached(user_client, page_urls):
+    for url in page_urls:
+        user_client.get(url)
+        assert user_client.get(url).templates
+
+
+def test_pages_keyed_by_page(client, many_posts_with_published_locations):
+    first = client.get('/')
+    assert client.get('/', {'page': 2}).content != first.content
+    assert client.get('/', {'utm_source': 'x'}).content == first.content
+
+
+def test_post_change_invalidates_pages(
+    client, page_urls, post_with_published_location
+):
+    for url in page_urls:
+        client.get(url)
+    post_with_published_location.title = 'Новый заголовок публикации'
+    post_with_published_location.save()
+    for url in page_urls:
+        assert 'Новый заголовок публикации' in client.get(
+            url).content.decode(), (
+            f'Убедитесь, что изменение поста сбрасывает кэш страницы `{url}`.'
+        )
+
+
+def test_related_changes_invalidate_pages(
+    client, page_urls, post_with_published_location, published_category,
+    published_location, django_capture_on_commit_callbacks
+):
+    for url in page_urls:
+        client.get(url)
+    with django_capture_on_commit_callbacks(execute=True):
+        published_category.title = 'Категория после правки'
+        published_category.save()
+        published_location.name = 'Место после правки'
+        published_location.save()
+    for url in page_urls:
+        content = client.get(url).content.decode()
+        assert 'Категория после правки' in content
+        assert 'Место после правки' in content
+
+
+def test_comment_invalidates_post_and_feeds(
+    client, user, page_urls, post_with_published_location
+):
+    for url in page_urls:
+        client.get(url)
+    author_client = Client()
+    author_client.force_login(user)
+    author_client.post(
+        f'/posts/{post_with_published_location.id}/comment/',
+        {'text': 'Свежий комментарий'},
+    )
+    detail = client.get(page_urls[-1]).content.decode()
+    assert 'Свежий комментарий' in detail
+    assert 'Комментарии (1)' in client.get('/').content.decode()
+
+
+def test_scheduled_post_invalidates_pages(
+    client, mixer, user, published_category, monkeypatch
+):
+    pub_date = timezone.now() + timedelta(seconds=30)
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=pub_date, title='Отложенная публикация',
+    )
+    assert post.title not in client.get('/').content.decode()
+    monkeypatch.setattr(
+        timezone, 'now', lambda: pub_date + timedelta(seconds=1)
+    )
+    assert post.title in client.get('/').content.decode(), (
+        'Убедитесь, что с наступлением даты отложенной публикации пост'
+        ' появляется на закэшированной странице ленты.'
+    )
+
+
+def test_page_cached_before_commit_is_dropped(
+    client, page_urls, post_with_published_location,
+    django_capture_on_commit_callbacks
+):
+    post = post_with_published_location
+    with django_capture_on_commit_callbacks() as callbacks:
+        post.title = 'Заголовок после коммита'
+        post.save()
+        # Параллельный запрос до коммита ещё видит прежний пост.
+        for model in (Post, TimelineEntry):
+            model.objects.filter(pk=post.pk).update(title='Прежний')
+        for url in page_urls:
+            client.get(url)
+        for model in (Post, TimelineEntry):
+            model.objects.filter(pk=post.pk).update(title=post.title)
+    for callback in callbacks:
+        callback()
+    for url in page_urls:
+        assert 'Заголовок после коммита' in client.get(url).content.decode(), (
+            f'Убедитесь, что страница `{url}`, закэшированная до коммита'
+            ' изменений, не отдаётся после него.'
+        )
@@ -0,0 +1,127 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.paginators import FeedPaginator
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _page_ids(response):
+    return [post.id for post in response.context['page_obj']]
+
+
+def _walk_forward(client, url):
+    response = client.get(url)
+    pages = [_page_ids(response)]
+    while response.context['page_obj'].has_next():
+        cursor = response.context['page_obj'].next_cursor
+        response = client.get(url, {'after': cursor})
+        pages.append(_page_ids(response))
+    return pages
+
+
+@pytest.mark.parametrize('url_name', ['index', 'category', 'profile'])
+def test_keyset_walk_covers_feed(
+    url_name, client, user, published_category,
+    many_posts_with_published_locations
+):
+    url = {
+        'index': '/',
+        'category': f'/category/{published_category.slug}/',
+        'profile': f'/profile/{user.username}/',
+    }[url_name]
+    expected = [
+        post.id for post in sorted(
+            many_posts_with_published_locations,
+            key=lambda post: (post.pub_date, post.id),
+            reverse=True,
+        )
+    ]
+    pages = _walk_forward(client, url)
+    assert [len(page) for page in pages] == [N_PER_PAGE, N_PER_PAGE], (
+        'Убедитесь, что при переходе по курсору `?after=` лента'
+        f' разбивается на страницы по {N_PER_PAGE} публикаций.'
+    )
+    assert sum(pages, []) == expected, (
+        'Убедитесь, что курсорная пагинация выдаёт все публикации ленты'
+        ' по одному разу и в порядке «от новых к старым».'
+    )
+
+
+def test_keyset_before_returns_previous_page(
+    client, many_posts_with_published_locations
+):
+    first = client.get('/')
+    second = client.get(
+        '/', {'after': first.context['page_obj'].next_cursor}
+    )
+    back = client.get(
+        '/', {'before': second.context['page_obj'].previous_cursor}
+    )
+    assert _page_ids(back) == _page_ids(first)
+    assert back.context['page_obj'].has_next()
+    assert not back.context['page_obj'].has_previous()
+
+
+def test_keyset_last_page(client, many_posts_with_published_locations):
+    response = client.get('/', {'before': ''})
+    page_obj = response.context['page_obj']
+    oldest = min(
+        many_posts_with_published_locations,
+        key=lambda post: (post.pub_date, post.id),
+    )
+    assert page_obj[len(page_obj) - 1].id == oldest.id
+    assert not page_obj.has_next()
+    assert page_obj.has_previous()
+
+
+def test_keyset_invalid_cursor_falls_back_to_first_page(
+    client, many_posts_with_published_locations
+):
+    assert (
+        _page_ids(client.get('/', {'after': 'not-a-cursor'}))
+        == _page_ids(client.get('/'))
+    )
+
+
+def test_keyset_page_has_no_count_or_offset(
+    client, many_posts_with_published_locations
+):
+    cursor = client.get('/').context['page_obj'].next_cursor
+    with CaptureQueriesContext(connection) as queries:
+        client.get('/', {'after': cursor})
+    feed_sql = [
+        query['sql'] for query in queries.captured_queries
+        if 'blog_post' in query['sql']
+        or 'blog_timelineentry' in query['sql']
+    ]
+    assert feed_sql
+    for sql in feed_sql:
+        assert 'COUNT(' not in sql.upper(), (
+            'Убедитесь, что курсорная страница не выполняет COUNT(*).'
+        )
+        assert 'OFFSET' not in sql.upper(), (
+            'Убедитесь, что курсорная страница не использует OFFSET.'
+        )
+
+
+@pytest.mark.parametrize('number,expected', [
+    (1, [1, 2, 3, '…', 5000]),
+    (2500, [1, '…', 2498, 2499, 2500, 2501, 2502, '…', 5000]),
+    (5000, [1, '…', 4998, 4999, 5000]),
+])
+def test_page_links_are_windowed(number, expected):
+    page = FeedPaginator(range(50000), N_PER_PAGE).get_page(number)
+    assert page.page_links == expected, (
+        'Убедитесь, что навигация выводит первую и последнюю страницы и'
+        ' окно вокруг текущей, а не все номера страниц.'
+    )
+
+
+def test_paginator_renders_windowed_links(
+    client, many_posts_with_published_locations
+):
+    content = client.get('/').content.decode()
+    assert 'href="?page=2"' in content
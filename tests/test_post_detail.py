@@ -0,0 +1,40 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def post_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response, [
+        query['sql'] for query in queries.captured_queries
+        if query['sql'].startswith('SELECT "blog_post"."id"')
+    ]
+
+
+def test_post_detail_fetches_post_once(
+    client, another_user_client, post_with_published_location
+):
+    url = f'/posts/{post_with_published_location.id}/'
+    for http_client in (client, another_user_client):
+        response, queries = post_queries(http_client, url)
+        assert response.status_code == 200
+        assert len(queries) == 1, (
+            'Убедитесь, что страница поста загружает публикацию из базы'
+            ' одним запросом.'
+        )
+
+
+def test_hidden_post_fetched_once(
+    another_user_client, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    url = f'/posts/{post.id}/'
+    response, queries = post_queries(another_user_client, url)
+    assert response.status_code == 404
+    assert len(queries) == 1
+    assert user_client.get(url).status_code == 200
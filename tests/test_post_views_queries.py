@@ -0,0 +1,76 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def post_loads(client, method, url, data=None):
+    with CaptureQueriesContext(connection) as queries:
+        response = getattr(client, method)(url, data or {})
+    loads = [
+        query['sql'] for query in queries.captured_queries
+        if query['sql'].startswith('SELECT "blog_post"."id"')
+    ]
+    return response, loads
+
+
+def edit_form_data(post):
+    return {
+        'title': 'Новый заголовок',
+        'text': post.text,
+        'pub_date': post.pub_date.strftime('%Y-%m-%d'),
+        'category': post.category_id,
+        'location': post.location_id or '',
+        'is_published': 'on',
+    }
+
+
+@pytest.mark.parametrize('method,action,status', [
+    ('get', 'edit', 200),
+    ('post', 'edit', 302),
+    ('get', 'delete', 200),
+    ('post', 'delete', 302),
+])
+def test_author_request_loads_post_once(
+    method, action, status, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    data = None
+    if (method, action) == ('post', 'edit'):
+        data = edit_form_data(post)
+    response, loads = post_loads(
+        user_client, method, f'/posts/{post.id}/{action}/', data
+    )
+    assert response.status_code == status
+    assert len(loads) == 1, (
+        f'Убедитесь, что запрос `{method.upper()} /posts/<post_id>/{action}/`'
+        f' загружает публикацию из базы один раз, а не {len(loads)}.'
+    )
+
+
+@pytest.mark.parametrize('action,status', [('edit', 302), ('delete', 403)])
+def test_non_author_request_loads_post_once(
+    action, status, another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    response, loads = post_loads(
+        another_user_client, 'get', f'/posts/{post.id}/{action}/'
+    )
+    assert response.status_code == status
+    assert len(loads) == 1
+
+
+def test_edit_moves_post_between_category_feeds(
+    client, user_client, post_with_published_location, another_category
+):
+    post = post_with_published_location
+    old_url = f'/category/{post.category.slug}/'
+    assert post.title in client.get(old_url).content.decode()
+    data = edit_form_data(post)
+    data['category'] = another_category.id
+    user_client.post(f'/posts/{post.id}/edit/', data)
+    assert post.title not in client.get(old_url).content.decode(), (
+        'Убедитесь, что после смены категории пост пропадает из ленты'
+        ' прежней категории.'
+    )
@@ -0,0 +1,71 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+FEED_TABLES = ('blog_post', 'blog_comment', 'blog_timelineentry')
+TABLE_SCAN = re.compile(r'^SCAN (\w+)$')
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def assert_plans_use_indexes(client, url, params=None):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params or {})
+    assert response.status_code == 200
+    checked = 0
+    for query in queries.captured_queries:
+        sql = query['sql']
+        if not any(f'"{table}"' in sql for table in FEED_TABLES):
+            continue
+        checked += 1
+        for step in explain(sql):
+            scan = TABLE_SCAN.match(step)
+            assert not (scan and scan.group(1) in FEED_TABLES), (
+                f'Запрос страницы `{url}` читает таблицу целиком'
+                f' ({step}):\n{sql}'
+            )
+            assert 'TEMP B-TREE' not in step, (
+                f'Запрос страницы `{url}` сортируется во временном'
+                f' B-дереве вместо индекса ({step}):\n{sql}'
+            )
+    assert checked, f'Страница `{url}` не обращается к публикациям.'
+
+
+@pytest.fixture
+def feed_urls(user, published_category, many_posts_with_published_locations):
+    return (
+        '/',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+    )
+
+
+@pytest.mark.parametrize('page', [None, '2'])
+def test_feed_query_plans(client, user_client, feed_urls, page):
+    params = {'page': page} if page else {}
+    for url in feed_urls:
+        assert_plans_use_indexes(client, url, params)
+        assert_plans_use_indexes(user_client, url, params)
+
+
+def test_keyset_feed_query_plans(client, user_client, feed_urls):
+    for url in feed_urls:
+        for http_client in (client, user_client):
+            cursor = http_client.get(url).context['page_obj'].next_cursor
+            assert_plans_use_indexes(http_client, url, {'after': cursor})
+            assert_plans_use_indexes(http_client, url, {'before': cursor})
+            assert_plans_use_indexes(http_client, url, {'before': ''})
+
+
+def test_post_detail_query_plans(client, user_client, comment_to_a_post):
+    url = f'/posts/{comment_to_a_post.post.id}/'
+    assert_plans_use_indexes(client, url)
+    assert_plans_use_indexes(user_client, url)
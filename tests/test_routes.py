@@ -0,0 +1,50 @@
+import pytest
+from django.urls import NoReverseMatch, reverse, set_script_prefix
+
+from blog import routes
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize('build,name,kwarg,value', [
+    (routes.post_detail_url, 'blog:post_detail', 'post_id', 42),
+    (routes.profile_url, 'blog:profile', 'username', 'some_user-1'),
+    (routes.category_url, 'blog:category_posts', 'category_slug', 'news'),
+])
+def test_routes_match_reverse(build, name, kwarg, value):
+    assert build(value) == reverse(name, kwargs={kwarg: value})
+    set_script_prefix('/blog/')
+    try:
+        assert build(value) == reverse(name, kwargs={kwarg: value}), (
+            'Убедитесь, что быстрые адреса учитывают префикс приложения.'
+        )
+    finally:
+        set_script_prefix('/')
+
+
+def test_routes_reject_what_reverse_rejects():
+    with pytest.raises(NoReverseMatch):
+        routes.profile_url('user.name')
+
+
+def test_card_links_rendered(
+    client, user, published_category, post_with_published_location
+):
+    content = client.get('/').content.decode()
+    post = post_with_published_location
+    for url in (
+        reverse('blog:post_detail', args=[post.id]),
+        reverse('blog:profile', args=[user.username]),
+        reverse('blog:category_posts', args=[published_category.slug]),
+    ):
+        assert f'href="{url}"' in content
+
+
+def test_feed_posts_share_route_table(
+    client, many_posts_with_published_locations
+):
+    page_obj = client.get('/').context['page_obj']
+    tables = {id(post.route_table) for post in page_obj}
+    assert len(tables) == 1 and None not in {
+        post.route_table for post in page_obj
+    }, 'Убедитесь, что посты страницы ленты получают общую таблицу адресов.'
@@ -0,0 +1,51 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def normalize(content):
+    return ' '.join(content.decode().split())
+
+
+@pytest.fixture
+def feed_urls(user, published_category, many_posts_with_published_locations):
+    return (
+        '/',
+        '/?page=2',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+    )
+
+
+def test_streamed_feeds_match_rendered(
+    settings, user_client, feed_urls
+):
+    rendered = [user_client.get(url) for url in feed_urls]
+    settings.BLOG_STREAM_FEEDS = True
+    for url, expected in zip(feed_urls, rendered):
+        response = user_client.get(url)
+        assert response.streaming, (
+            f'Убедитесь, что при BLOG_STREAM_FEEDS страница `{url}`'
+            ' отдаётся потоково.'
+        )
+        content = b''.join(response.streaming_content)
+        assert normalize(content) == normalize(expected.content)
+
+
+def test_stream_sends_head_first(settings, client, feed_urls):
+    settings.BLOG_STREAM_FEEDS = True
+    chunks = iter(client.get('/').streaming_content)
+    head = next(chunks).decode()
+    assert '<head>' in head and 'card-title' not in head, (
+        'Убедитесь, что начало страницы отправляется до карточек постов.'
+    )
+
+
+def test_streamed_page_cached_for_anonymous(
+    settings, client, feed_urls, django_assert_num_queries
+):
+    settings.BLOG_STREAM_FEEDS = True
+    first = b''.join(client.get('/').streaming_content)
+    with django_assert_num_queries(0):
+        second = client.get('/')
+    assert second.content == first
@@ -0,0 +1,82 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import TimelineEntry
+
+pytestmark = [pytest.mark.django_db]
+
+
+def entry_for(post):
+    return TimelineEntry.objects.filter(post_id=post.pk).first()
+
+
+def test_feeds_read_only_timeline(
+    another_user_client, user, published_category,
+    many_posts_with_published_locations
+):
+    for url in (
+        '/',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+    ):
+        another_user_client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            another_user_client.get(url)
+        for query in queries.captured_queries:
+            assert 'FROM "blog_post"' not in query['sql'], (
+                f'Убедитесь, что лента `{url}` читает таблицу'
+                ' TimelineEntry, а не публикации с соединениями.'
+            )
+
+
+def test_timeline_follows_post(post_with_published_location):
+    post = post_with_published_location
+    entry = entry_for(post)
+    assert entry.title == post.title
+    assert entry.location_name == post.location.name
+    assert entry.updated_at == post.updated_at
+    post.title = 'Новый заголовок'
+    post.save()
+    assert entry_for(post).title == 'Новый заголовок'
+    post.is_published = False
+    post.save()
+    assert entry_for(post) is None, (
+        'Убедитесь, что снятый с публикации пост пропадает из ленты.'
+    )
+
+
+def test_timeline_follows_related_objects(
+    user, post_with_published_location, published_category,
+    published_location
+):
+    post = post_with_published_location
+    user.username = 'renamed_author'
+    user.save()
+    published_category.title = 'Новая категория'
+    published_category.save()
+    published_location.delete()
+    entry = entry_for(post)
+    assert entry.author_username == 'renamed_author'
+    assert entry.category_title == 'Новая категория'
+    assert entry.location_name == ''
+    post.refresh_from_db()
+    assert entry.updated_at == post.updated_at
+    published_category.is_published = False
+    published_category.save()
+    assert entry_for(post) is None
+
+
+def test_timeline_comment_count(user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Комментарий'})
+    assert entry_for(post).comment_count == 1
+
+
+def test_rebuild_timeline(post_with_published_location):
+    TimelineEntry.objects.all().delete()
+    call_command('rebuild_timeline', stdout=StringIO())
+    assert entry_for(post_with_published_location) is not None
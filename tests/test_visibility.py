@@ -0,0 +1,117 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+from blog.publication import (
+    next_publication, post_published, publish_due_posts
+)
+
+pytestmark = [pytest.mark.django_db]
+
+
+def is_visible(post):
+    return Post.objects.values_list('is_visible', flat=True).get(pk=post.pk)
+
+
+def test_visibility_follows_post_fields(post_with_published_location):
+    post = post_with_published_location
+    assert is_visible(post)
+    post.is_published = False
+    post.save(update_fields=['is_published'])
+    assert not is_visible(post), (
+        'Убедитесь, что снятие поста с публикации сбрасывает is_visible.'
+    )
+    post.is_published = True
+    post.pub_date = timezone.now() + timedelta(days=1)
+    post.save()
+    assert not is_visible(post)
+
+
+def test_visibility_follows_category(
+    post_with_published_location, published_category
+):
+    post = post_with_published_location
+    published_category.is_published = False
+    published_category.save()
+    assert not is_visible(post), (
+        'Убедитесь, что снятие категории с публикации скрывает её посты.'
+    )
+    published_category.is_published = True
+    published_category.save()
+    assert is_visible(post)
+    published_category.delete()
+    assert not is_visible(post)
+
+
+def test_due_posts_published(mixer, user, published_category):
+    pub_date = timezone.now() + timedelta(hours=1)
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=pub_date,
+    )
+    assert next_publication() == pub_date
+    assert publish_due_posts() == 0
+    assert publish_due_posts(now=pub_date) == 1
+    assert is_visible(post)
+    assert next_publication() is None
+
+
+def test_publish_scheduled_command(mixer, user, published_category):
+    pub_date = timezone.now() + timedelta(hours=1)
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=pub_date,
+    )
+    out = StringIO()
+    call_command('publish_scheduled', stdout=out)
+    assert 'Опубликовано постов: 0' in out.getvalue()
+    assert timezone.localtime(pub_date).isoformat(
+        timespec='seconds') in out.getvalue(), (
+        'Убедитесь, что команда publish_scheduled сообщает дату'
+        ' ближайшей отложенной публикации.'
+    )
+    Post.objects.filter(pk=post.pk).update(pub_date=timezone.now())
+    call_command('publish_scheduled', stdout=StringIO())
+    assert is_visible(post)
+
+
+def test_post_published_signal(mixer, user, published_category):
+    pub_date = timezone.now() + timedelta(hours=1)
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=pub_date,
+    )
+    received = []
+
+    def receiver(sender, post_ids, **kwargs):
+        received.extend(post_ids)
+
+    post_published.connect(receiver)
+    try:
+        publish_due_posts(now=pub_date)
+    finally:
+        post_published.disconnect(receiver)
+    assert received == [post.pk]
+
+
+def test_worker_disables_request_hook(
+    client, mixer, user, published_category, monkeypatch, settings
+):
+    settings.BLOG_PUBLICATION_WORKER = True
+    pub_date = timezone.now() + timedelta(seconds=30)
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=pub_date,
+    )
+    monkeypatch.setattr(
+        timezone, 'now', lambda: pub_date + timedelta(seconds=1)
+    )
+    client.get('/')
+    assert not is_visible(post), (
+        'Убедитесь, что при BLOG_PUBLICATION_WORKER = True посты'
+        ' публикует только команда publish_scheduled.'
+    )
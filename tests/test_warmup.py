@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.template import engines
+
+from blogicum.warmup import compile_templates, resolve_urls
+
+
+def test_warm_up_compiles_every_project_template():
+    expected = len(list(settings.TEMPLATES_DIR.rglob('*.html')))
+    assert compile_templates() == expected, (
+        'Убедитесь, что прогрев компилирует все шаблоны проекта.'
+    )
+
+
+def test_warm_up_resolves_urls():
+    assert resolve_urls() > 0
+
+
+def test_template_loaders_configured_explicitly():
+    assert engines['django'].engine.loaders == settings.TEMPLATE_LOADERS